@@ -6,6 +6,7 @@ from app.api.communities.views import router as communities_router
 from app.api.auth.service import http_bearer
 from app.api.topic.views import router as topic_router
 from app.api.post.views import router as post_router
+from app.api.service.views import router as service_router
 
 
 router = APIRouter()
@@ -34,3 +35,9 @@ router.include_router(
     prefix="/post",
     tags=["post"]
 )
+
+router.include_router(
+    router=service_router,
+    prefix="/service",
+    tags=["service"]
+)
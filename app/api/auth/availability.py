@@ -0,0 +1,154 @@
+import asyncio
+from typing import Annotated, AsyncIterator
+
+from fastapi.params import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.bloom import RedisBloomFilter
+from app.core.metrics import metrics
+from app.db.models.user import User
+from app.db.session import get_read_db, get_redis
+from app.utils.mixins import LoggerMixin
+
+from .user_dal import UserDataAccessLayer
+
+
+class UserIdentityFilter(LoggerMixin):
+    """
+    Фильтр Блума занятых логинов и email в Redis.
+
+    Ответ "точно свободно" не требует запроса к БД, "возможно занято"
+    подтверждается запросом. Биты лежат в Redis, поэтому регистрация в
+    любом воркере сразу видна всем. Удалённые пользователи остаются в
+    фильтре до пересборки: это лишь ложноположительный ответ, который
+    проверит БД. Пересборку раз в interval выполняет один воркер. Пока
+    фильтр не построен или Redis недоступен, все проверки идут в БД.
+    Окончательную защиту от дублей по-прежнему даёт уникальное ограничение.
+    """
+    _prefix = "user_identity_filter"
+
+    def __init__(self, redis_client: Redis, capacity: int, error_rate: float) -> None:
+        self.redis_client = redis_client
+        self._filter = RedisBloomFilter(redis_client, self._prefix, capacity, error_rate)
+
+    @property
+    def _rebuild_lock_key(self) -> str:
+        return f"{self._filter.key}:rebuild_lock"
+
+    @staticmethod
+    def _username_item(username: str) -> str:
+        return f"username:{username}"
+
+    @staticmethod
+    def _email_item(email: str) -> str:
+        return f"email:{email}"
+
+    async def add(self, username: str, email: str) -> None:
+        try:
+            await self._filter.add(self._username_item(username), self._email_item(email))
+        except RedisError as e:
+            # До пересборки проверка может ответить "свободно", дубль отсечёт ограничение БД
+            self.logger.error("Не удалось добавить пользователя в фильтр логинов и email",
+                              extra={"username": username, "error": str(e)})
+
+    async def _might_contain(self, item: str) -> bool:
+        try:
+            found = await self._filter.contains(item)
+        except RedisError as e:
+            self.logger.warning("Фильтр логинов и email недоступен", extra={"error": str(e)})
+            return True
+        if found is None:
+            return True
+        if found:
+            metrics.increment("user_identity_filter_positive")
+            return True
+        metrics.increment("user_identity_filter_negative")
+        return False
+
+    async def might_contain_username(self, username: str) -> bool:
+        return await self._might_contain(self._username_item(username))
+
+    async def might_contain_email(self, email: str) -> bool:
+        return await self._might_contain(self._email_item(email))
+
+    async def _identities(self, session_factory: sessionmaker) -> AsyncIterator[str]:
+        async with session_factory() as session:
+            query = select(User.username, User.email).execution_options(yield_per=10000)
+            result = await session.stream(query)
+            async for username, email in result:
+                yield self._username_item(username)
+                yield self._email_item(email)
+
+    async def rebuild(self, session_factory: sessionmaker, interval: int) -> bool:
+        """
+        Построение фильтра заново по таблице users
+
+        :return: False, если фильтр уже пересобирал другой воркер в этом интервале
+        """
+        if not await self.redis_client.set(self._rebuild_lock_key, 1, nx=True, ex=interval):
+            return False
+        try:
+            items = await self._filter.rebuild(self._identities(session_factory), timeout=interval)
+        except BaseException:
+            # Следующая попытка не должна ждать целый интервал
+            await self.redis_client.delete(self._rebuild_lock_key)
+            raise
+        self.logger.info("Фильтр логинов и email построен", extra={"users": items // 2})
+        return True
+
+    async def run_rebuild(self, session_factory: sessionmaker, interval: int) -> None:
+        """Фоновое построение фильтра при старте и периодическая пересборка"""
+        while True:
+            try:
+                await self.rebuild(session_factory, interval)
+            except (SQLAlchemyError, RedisError, OSError) as e:
+                self.logger.warning(
+                    "Не удалось построить фильтр логинов и email",
+                    extra={"error": str(e)})
+            await asyncio.sleep(interval)
+
+
+def get_user_identity_filter(redis_client: Annotated[Redis, Depends(get_redis)]) -> UserIdentityFilter:
+    return UserIdentityFilter(
+        redis_client=redis_client,
+        capacity=settings.user_identity_filter_capacity,
+        error_rate=settings.user_identity_filter_error_rate,
+    )
+
+
+class AvailabilityService(LoggerMixin):
+    """Проверка, свободны ли логин и email"""
+
+    def __init__(self, identity_filter: UserIdentityFilter, user_dal: UserDataAccessLayer) -> None:
+        self.identity_filter = identity_filter
+        self.user_dal = user_dal
+
+    async def check(self, username: str | None = None, email: str | None = None) -> dict[str, bool]:
+        """
+        В БД идут только значения, которые фильтр Блума считает возможно занятыми.
+
+        :return: Для каждого переданного поля - свободно ли значение
+        """
+        result = {}
+        if username is not None:
+            result["username"] = not (
+                await self.identity_filter.might_contain_username(username)
+                and await self.user_dal.username_exists(username))
+        if email is not None:
+            result["email"] = not (
+                await self.identity_filter.might_contain_email(email)
+                and await self.user_dal.email_exists(email))
+        return result
+
+
+def get_availability_service(
+        db_session: Annotated[AsyncSession, Depends(get_read_db)],
+        identity_filter: Annotated[UserIdentityFilter, Depends(get_user_identity_filter)]) -> AvailabilityService:
+    """Проверка только читает: сессия чтения вместо единицы работы с фиксацией"""
+    return AvailabilityService(identity_filter, UserDataAccessLayer(db_session))
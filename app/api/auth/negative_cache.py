@@ -0,0 +1,107 @@
+import hashlib
+from typing import Annotated
+
+from fastapi.params import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.metrics import metrics
+from app.db.session import get_redis
+from app.utils.mixins import LoggerMixin
+
+
+# Запись логина, только если с момента чтения поколения не было регистраций
+REMEMBER_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], 1, 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class UnknownUsernameCache(LoggerMixin):
+    """
+    Негативный кэш несуществующих логинов.
+
+    После промаха в БД логин запоминается в Redis на короткий TTL, и
+    повторные попытки входа с ним не доходят до Postgres. Запись
+    удаляется при регистрации пользователя с этим логином.
+
+    Каждая регистрация увеличивает поколение. Вход читает его до SELECT
+    и записывает промах только при неизменном поколении, иначе промах,
+    случившийся до фиксации параллельной регистрации, закрыл бы вход
+    новому пользователю на ttl.
+    """
+    _prefix = "unknown_username"
+
+    def __init__(self, redis_client: Redis, ttl: int = 60) -> None:
+        """
+        :param redis_client: Клиент Redis
+        :param ttl: Время жизни записи в секундах
+        """
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._remember_script = redis_client.register_script(REMEMBER_SCRIPT)
+
+    def _key(self, username: str) -> str:
+        digest = hashlib.blake2b(
+            username.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self._prefix}:{digest}"
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self._prefix}:generation"
+
+    async def generation(self) -> str | None:
+        """Поколение регистраций, None если Redis недоступен"""
+        try:
+            return await self.redis_client.get(self._generation_key) or "0"
+        except RedisError as e:
+            self.logger.warning(
+                "Негативный кэш логинов недоступен", extra={"error": str(e)})
+            return None
+
+    async def is_unknown(self, username: str) -> bool:
+        try:
+            unknown = await self.redis_client.exists(self._key(username))
+        except RedisError as e:
+            self.logger.warning(
+                "Негативный кэш логинов недоступен", extra={"error": str(e)})
+            return False
+        if unknown:
+            metrics.increment("unknown_username_cache_hits")
+        return bool(unknown)
+
+    async def remember(self, username: str, generation: str | None) -> None:
+        """
+        :param generation: Поколение, прочитанное до поиска логина в БД
+        """
+        if generation is None:
+            return
+        try:
+            stored = await self._remember_script(
+                keys=[self._key(username), self._generation_key],
+                args=[generation, self.ttl])
+        except RedisError as e:
+            self.logger.warning(
+                "Не удалось сохранить логин в негативный кэш", extra={"error": str(e)})
+            return
+        if not stored:
+            metrics.increment("unknown_username_cache_skipped")
+
+    async def forget(self, username: str) -> None:
+        """Вызывается после фиксации регистрации"""
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key)
+                pipe.delete(self._key(username))
+                await pipe.execute()
+        except RedisError as e:
+            self.logger.error(
+                "Не удалось удалить логин из негативного кэша", extra={"error": str(e)})
+
+
+def get_unknown_username_cache(redis_client: Annotated[Redis, Depends(get_redis)]) -> UnknownUsernameCache:
+    return UnknownUsernameCache(redis_client=redis_client, ttl=settings.unknown_username_cache_ttl)
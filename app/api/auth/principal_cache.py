@@ -0,0 +1,71 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi.params import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.metrics import metrics
+from app.db.session import get_redis
+from app.utils.mixins import LoggerMixin
+
+from .schemas import CurrentUser
+
+
+class PrincipalCache(LoggerMixin):
+    """
+    Кэш аутентифицированных пользователей в Redis.
+
+    Хранит небольшой набор полей пользователя, чтобы не делать SELECT
+    по users на каждый авторизованный запрос. Запись сбрасывается при
+    удалении пользователя и изменении его флагов, а TTL ограничивает
+    устаревание данных. Ошибки Redis не ломают аутентификацию: запрос
+    просто уходит в БД.
+    """
+    _prefix = "principal"
+
+    def __init__(self, redis_client: Redis, ttl: int = 60) -> None:
+        """
+        :param redis_client: Клиент Redis
+        :param ttl: Время жизни записи в секундах
+        """
+        self.redis_client = redis_client
+        self.ttl = ttl
+
+    def _key(self, user_id: UUID | str) -> str:
+        return f"{self._prefix}:{user_id}"
+
+    async def get(self, user_id: UUID | str) -> CurrentUser | None:
+        try:
+            cached = await self.redis_client.get(self._key(user_id))
+        except RedisError as e:
+            self.logger.warning(
+                "Кэш пользователей недоступен", extra={"error": str(e)})
+            return None
+        if not cached:
+            metrics.increment("principal_cache_misses")
+            return None
+        metrics.increment("principal_cache_hits")
+        return CurrentUser.model_validate_json(cached)
+
+    async def set(self, principal: CurrentUser) -> None:
+        try:
+            await self.redis_client.setex(
+                self._key(principal.id), self.ttl, principal.model_dump_json())
+        except RedisError as e:
+            self.logger.warning(
+                "Не удалось сохранить пользователя в кэш", extra={"error": str(e)})
+
+    async def invalidate(self, user_id: UUID | str) -> None:
+        self.logger.info("Сброс кэша пользователя", extra={"user_id": user_id})
+        try:
+            await self.redis_client.delete(self._key(user_id))
+        except RedisError as e:
+            self.logger.error(
+                "Не удалось сбросить кэш пользователя",
+                extra={"user_id": user_id, "error": str(e)})
+
+
+def get_principal_cache(redis_client: Annotated[Redis, Depends(get_redis)]) -> PrincipalCache:
+    return PrincipalCache(redis_client=redis_client, ttl=settings.principal_cache_ttl)
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from typing import Annotated
+from uuid import UUID
+
+from fastapi.params import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.bloom import BloomFilter
+from app.core.metrics import metrics
+from app.db.session import get_redis
+from app.utils.mixins import LoggerMixin
+
+
+REVOKED_KEY = "refresh_revoked"
+
+
+class RevocationFilter(LoggerMixin):
+    """
+    Фильтр Блума отозванных jti в памяти процесса.
+
+    Если jti нет в фильтре, токен точно не отозван и Redis не нужен.
+    Положительный ответ подтверждается запросом в Redis. Фильтр
+    периодически пересобирается из Redis, чтобы видеть отзывы,
+    сделанные другими воркерами, и забывать истёкшие токены.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+
+    def add(self, jti: str) -> None:
+        self._filter.add(jti)
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._filter
+
+    async def sync(self, redis_client: Redis) -> None:
+        """Пересборка фильтра из множества отозванных jti в Redis"""
+        await redis_client.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+        revoked = await redis_client.zrange(REVOKED_KEY, 0, -1)
+        bloom = BloomFilter(max(self.capacity, len(revoked) * 2), self.error_rate)
+        for jti in revoked:
+            bloom.add(jti)
+        self._filter = bloom
+        self.logger.debug("Фильтр отозванных токенов синхронизирован",
+                          extra={"revoked": len(revoked)})
+
+    async def run_sync(self, redis_client: Redis, interval: int) -> None:
+        """Фоновая синхронизация фильтра с Redis"""
+        while True:
+            try:
+                await self.sync(redis_client)
+            except RedisError as e:
+                self.logger.warning(
+                    "Не удалось синхронизировать фильтр отозванных токенов",
+                    extra={"error": str(e)})
+            await asyncio.sleep(interval)
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.refresh_revocation_filter_capacity,
+    error_rate=settings.refresh_revocation_filter_error_rate,
+)
+
+
+class RefreshTokenStore(LoggerMixin):
+    """
+    Хранилище выданных refresh токенов в Redis.
+
+    Для каждого пользователя хранится ZSET jti -> exp. Токен одноразовый:
+    при обновлении jti удаляется из множества, и повторное предъявление
+    того же токена считается кражей - отзываются все токены пользователя.
+    Отозванный токен и повтор в пределах refresh_token_reuse_grace_seconds
+    после ротации (параллельные обновления одного клиента) только отклоняются.
+    """
+    _prefix = "refresh_tokens"
+    _rotated_prefix = "refresh_rotated"
+
+    def __init__(self, redis_client: Redis, revoked: RevocationFilter,
+                 reuse_grace: int = settings.refresh_token_reuse_grace_seconds) -> None:
+        self.redis_client = redis_client
+        self.revoked = revoked
+        self.reuse_grace = reuse_grace
+
+    def _key(self, user_id: UUID | str) -> str:
+        return f"{self._prefix}:{user_id}"
+
+    def _rotated_key(self, jti: str) -> str:
+        return f"{self._rotated_prefix}:{jti}"
+
+    async def add(self, user_id: UUID | str, jti: str, expire: float) -> None:
+        """Регистрация выданного токена"""
+        key = self._key(user_id)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, "-inf", time.time())
+            pipe.zadd(key, {jti: expire})
+            pipe.expireat(key, int(expire) + 1)
+            await pipe.execute()
+
+    async def consume(self, user_id: UUID | str, jti: str) -> bool:
+        """
+        Одноразовое использование токена при обновлении
+
+        Из множества удаляются только истёкшие токены, которые не проходят
+        проверку exp раньше, поэтому отсутствие jti означает одно из трёх:
+        токен отозван (выход на другом воркере до синхронизации фильтра),
+        только что погашен параллельным обновлением или использован повторно.
+        Все токены пользователя отзываются только в последнем случае.
+
+        :return: True если токен был действителен и погашен
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key(user_id), jti)
+            pipe.zscore(REVOKED_KEY, jti)
+            pipe.set(self._rotated_key(jti), 1, nx=True, ex=self.reuse_grace)
+            removed, revoked_score, first_use = await pipe.execute()
+        if removed:
+            return True
+        if revoked_score is not None:
+            self.logger.info("Предъявлен отозванный refresh токен", extra={"user_id": user_id})
+            self.revoked.add(jti)
+            return False
+        if not first_use:
+            self.logger.warning(
+                "Повтор refresh токена сразу после ротации", extra={"user_id": user_id})
+            metrics.increment("refresh_token_concurrent_rotation")
+            return False
+        self.logger.warning(
+            "Повторное использование refresh токена, отзыв всех токенов",
+            extra={"user_id": user_id})
+        metrics.increment("refresh_token_reuse")
+        await self.revoke_all(user_id)
+        return False
+
+    async def revoke(self, user_id: UUID | str, jti: str, expire: float) -> None:
+        """Отзыв одного токена"""
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key(user_id), jti)
+            pipe.zadd(REVOKED_KEY, {jti: expire})
+            await pipe.execute()
+        self.revoked.add(jti)
+
+    async def revoke_all(self, user_id: UUID | str) -> None:
+        """Отзыв всех выданных пользователю токенов"""
+        key = self._key(user_id)
+        tokens = await self.redis_client.zrange(key, 0, -1, withscores=True)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if tokens:
+                pipe.zadd(REVOKED_KEY, dict(tokens))
+            pipe.delete(key)
+            await pipe.execute()
+        for jti, _ in tokens:
+            self.revoked.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """Проверка отзыва: без обращения к Redis, если jti нет в фильтре"""
+        if jti not in self.revoked:
+            metrics.increment("refresh_revocation_filter_negative")
+            return False
+        metrics.increment("refresh_revocation_filter_positive")
+        return await self.redis_client.zscore(REVOKED_KEY, jti) is not None
+
+
+def get_refresh_token_store(redis_client: Annotated[Redis, Depends(get_redis)]) -> RefreshTokenStore:
+    return RefreshTokenStore(redis_client=redis_client, revoked=revocation_filter)
@@ -32,10 +32,36 @@ class ShowUsers(BaseModel):
         from_attributes = True
 
 
+class ClaimsUser(BaseModel):
+    """Пользователь, восстановленный из проверенных claims access-токена"""
+    id: uuid.UUID
+    username: str
+    email: EmailStr
+
+
+class CurrentUser(ClaimsUser):
+    """Аутентифицированный пользователь: поля, нужные маршрутам"""
+    is_active: bool | None = None
+    is_superuser: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+class UpdateUserFlags(BaseModel):
+    is_active: bool | None = None
+    is_superuser: bool | None = None
+
+
 class DeleteUserShow(BaseModel):
     id: uuid.UUID
 
 
+class AvailabilityShow(BaseModel):
+    username: bool | None = None
+    email: bool | None = None
+
+
 class LoginUser(BaseModel):
     username: str
     password: str
@@ -1,7 +1,17 @@
+import asyncio
 import bcrypt
 import logging
 import uuid
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.config import settings
+from app.exceptions import PasswordHasherBusyException
+from app.utils.mixins import LoggerMixin
+
+T = TypeVar("T")
+
 
 def get_password_hashing(password: str) -> str:
     """
@@ -88,6 +98,142 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         raise
 
 
+class AsyncPasswordHasher(LoggerMixin):
+    """
+    Асинхронное хэширование и проверка паролей в ограниченном пуле воркеров.
+
+    bcrypt занимает CPU на сотни миллисекунд, поэтому вызовы выносятся
+    из event loop в пул потоков или процессов. Количество одновременных
+    операций ограничено семафором: сверх лимита запросы ждут в очереди
+    не дольше queue_timeout, а при переполнении очереди сразу получают отказ.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        max_workers: int = 4,
+        max_concurrency: int = 4,
+        max_waiting: int = 64,
+        queue_timeout: float = 2.0,
+    ) -> None:
+        """
+        :param executor_type: Тип пула: thread или process
+        :param max_workers: Количество воркеров пула
+        :param max_concurrency: Максимум одновременно выполняемых операций
+        :param max_waiting: Максимальная длина очереди ожидания
+        :param queue_timeout: Время ожидания свободного слота в секундах
+        """
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Неизвестный тип пула: {executor_type!r}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self.logger.info(
+                "Создание пула хэширования паролей",
+                extra={
+                    "executor_type": self.executor_type,
+                    "max_workers": self.max_workers
+                }
+            )
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _acquire_slot(self) -> None:
+        """Занимает слот пула либо ожидает его в ограниченной очереди"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+
+        if self.queue_timeout <= 0 or self._waiting >= self.max_waiting:
+            self.logger.warning(
+                "Пул хэширования паролей перегружен, запрос отклонён",
+                extra={"waiting": self._waiting}
+            )
+            raise PasswordHasherBusyException(
+                "Сервис временно перегружен, повторите попытку позже")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "Истекло время ожидания слота хэширования пароля",
+                extra={"queue_timeout": self.queue_timeout}
+            )
+            raise PasswordHasherBusyException(
+                "Сервис временно перегружен, повторите попытку позже")
+        finally:
+            self._waiting -= 1
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        await self._acquire_slot()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """
+        Хэширование пароля вне event loop
+
+        :param password: Пароль для хэширования
+        :return: Захэшированный пароль
+        :raises PasswordHasherBusyException: Если пул перегружен
+        """
+        return await self._run(get_password_hashing, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Проверка пароля вне event loop
+
+        :param plain_password: Введенный пароль
+        :param hashed_password: Захэшированный пароль
+        :return: Результат проверки пароля
+        :raises PasswordHasherBusyException: Если пул перегружен
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Остановка пула воркеров"""
+        if self._executor is not None:
+            self.logger.info("Остановка пула хэширования паролей")
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_password_hasher: AsyncPasswordHasher | None = None
+
+
+def get_password_hasher() -> AsyncPasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = AsyncPasswordHasher(
+            executor_type=settings.password_hash_executor,
+            max_workers=settings.password_hash_workers,
+            max_concurrency=settings.password_hash_max_concurrency,
+            max_waiting=settings.password_hash_max_waiting,
+            queue_timeout=settings.password_hash_queue_timeout,
+        )
+    return _password_hasher
+
+
 class PasswordHashing:
     """
      Класс для безопасного хеширования и проверки паролей
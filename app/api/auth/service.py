@@ -1,3 +1,6 @@
+import asyncio
+import time
+import uuid
 from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
@@ -8,22 +11,28 @@ from fastapi.security import HTTPBearer, OAuth2PasswordBearer
 
 from app.db.models.user import User
 from app.db.db_exception_handler import get_db_exception_handler
-from app.db.session import get_db
-from app.exceptions import NotFoundException, TokenValidationsException
+from app.db.session import get_db_session_factory, get_read_db
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
+from app.exceptions import NotFoundException, PermissionsError, TokenValidationsException, UniqueError
 from app.config import settings
 from app.utils.mixins import LoggerMixin
 
 from .user_dal import UserDataAccessLayer
-from .schemas import RegisterUsers
-from .security import get_password_hashing, verify_password
+from .schemas import RegisterUsers, CurrentUser, ClaimsUser
+from .principal_cache import PrincipalCache, get_principal_cache
+from .refresh_store import RefreshTokenStore, get_refresh_token_store
+from .negative_cache import UnknownUsernameCache, get_unknown_username_cache
+from .availability import AvailabilityService, UserIdentityFilter, get_user_identity_filter
+from .security import AsyncPasswordHasher, get_password_hasher
 from .utils_jwt import JWTManager, get_jwt_manager
 
 from uuid import UUID
-from typing import Annotated
+from typing import Annotated, Callable
 
 from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, DecodeError
 
 TOKEN_TYPE_FIELD = "type"
+TOKEN_ID_FIELD = "jti"
 ACCESS_TOKEN_TYPE = "access"
 REFRESH_TOKEN_TYPE = "refresh"
 
@@ -32,56 +41,152 @@ oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
 class UserService(LoggerMixin):
-    def __init__(self, db_session: Annotated[AsyncSession, Depends(get_db)]) -> None:
-        self.db_session = db_session
-        self.user_dal = UserDataAccessLayer(db_session)
+    def __init__(
+        self,
+        uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+        password_hasher: Annotated[AsyncPasswordHasher, Depends(get_password_hasher)],
+        principal_cache: Annotated[PrincipalCache, Depends(get_principal_cache)],
+        unknown_username_cache: Annotated[UnknownUsernameCache, Depends(get_unknown_username_cache)],
+        identity_filter: Annotated[UserIdentityFilter, Depends(get_user_identity_filter)]
+    ) -> None:
+        self.uow = uow
+        self.db_session = uow.session
+        self.user_dal = UserDataAccessLayer(uow.session)
         self.db_exceptio_handler = get_db_exception_handler()
+        self.password_hasher = password_hasher
+        self.principal_cache = principal_cache
+        self.unknown_username_cache = unknown_username_cache
+        self.identity_filter = identity_filter
 
     async def create_user(self, user_register: RegisterUsers) -> User | None:
         self.logger.info("Создание пользователя")
+        availability = await self.check_availability(
+            username=user_register.username, email=user_register.email)
+        for field, available in availability.items():
+            if not available:
+                self.logger.warning(f"Регистрация отклонена до хэширования: {field} занят")
+                raise UniqueError(f"Пользователь с {field} уже существует!")
         try:
-            hashing_password = get_password_hashing(
+            hashing_password = await self.password_hasher.hash(
                 password=user_register.password)
             new_user = await self.user_dal.create_user(
                 username=user_register.username,
                 email=user_register.email,
                 password=hashing_password
             )
-            await self.db_session.commit()
-            self.logger.info(f"Пользователь: {new_user.username} создан")
-            return new_user
         except IntegrityError as e:
             self.logger.error(f"Ошибка создания: {e}", exc_info=True)
-            await self.db_session.rollback()
             self.db_exceptio_handler.handle_exception(e)
+            return None
+        username, email = new_user.username, new_user.email
+
+        async def on_commit() -> None:
+            await self.identity_filter.add(username, email)
+            await self.unknown_username_cache.forget(username)
+
+        self.uow.after_commit(on_commit)
+        self.logger.info(f"Пользователь: {username} создан")
+        return new_user
+
+    async def check_availability(self, username: str | None = None, email: str | None = None) -> dict[str, bool]:
+        """Проверка, свободны ли логин и email, в сессии единицы работы"""
+        return await AvailabilityService(self.identity_filter, self.user_dal).check(
+            username=username, email=email)
 
     async def delete_user(self, id: UUID) -> User:
         del_user = await self.user_dal.delete_user(id)
-        await self.db_session.commit()
+        self.uow.after_commit(lambda: self.principal_cache.invalidate(id))
         return del_user
 
+    async def update_user_flags(
+        self,
+        id: UUID,
+        current_user: CurrentUser,
+        is_active: bool | None = None,
+        is_superuser: bool | None = None
+    ) -> User:
+        if not current_user.is_superuser:
+            self.logger.warning("У пользователя нету прав доступа!")
+            raise PermissionsError(
+                f"Недостаточно прав у пользователя {current_user.username}")
+        flags = {
+            name: value for name, value in
+            (("is_active", is_active), ("is_superuser", is_superuser))
+            if value is not None
+        }
+        user = await self.user_dal.update_user_flags(id, **flags)
+        self.uow.after_commit(lambda: self.principal_cache.invalidate(id))
+        return user
+
 
 class AuthService(LoggerMixin):
 
     def __init__(
         self,
-        db_session: AsyncSession,
-        jwt_manager: JWTManager
+        db_session: AsyncSession | None,
+        jwt_manager: JWTManager,
+        password_hasher: AsyncPasswordHasher | None = None,
+        principal_cache: PrincipalCache | None = None,
+        refresh_store: RefreshTokenStore | None = None,
+        unknown_username_cache: UnknownUsernameCache | None = None,
+        session_factory: Callable[[], AsyncSession] | None = None
     ):
+        """
+        :param session_factory: Короткие сессии для поиска пользователя при входе
+        """
         self.db_session = db_session
+        self.session_factory = session_factory
         self.user_dal = UserDataAccessLayer(db_session)
         self.jwt_manager = jwt_manager
+        self.password_hasher = password_hasher
+        self.principal_cache = principal_cache
+        self.refresh_store = refresh_store
+        self.unknown_username_cache = unknown_username_cache
 
     async def authenticate_user(self, username: str, password: str):
+        """
+        Аутентификация по логину и паролю.
+
+        Несуществующий логин и неверный пароль неразличимы: в обоих случаях
+        возвращается None, а ответ выравнивается до login_min_response_ms.
+        Пользователь ищется в собственной короткой сессии, поэтому соединение
+        с БД возвращается в пул до очереди bcrypt и выравнивания.
+        """
         self.logger.info("аунтентификация пользователя", extra={
                          "username": username, "len_password": len(password)})
-        user = await self.user_dal.get_user_by_username(username)
-        if user and verify_password(password, user.password):
-            self.logger.info("Успешная аутентификация", extra={
-                             "username": username, "len_password": len(password)})
-            return user
-        self.logger.warning("Неверный пароль для пользователя")
-        return None
+        started = time.monotonic()
+        try:
+            user = await self._get_login_user(username)
+            if user and await self.password_hasher.verify(password, user.password):
+                self.logger.info("Успешная аутентификация", extra={
+                                 "username": username, "len_password": len(password)})
+                return user
+            self.logger.warning("Неверный логин или пароль для пользователя")
+            return None
+        finally:
+            await self._pad_response(started)
+
+    async def _get_login_user(self, username: str) -> User | None:
+        generation = None
+        if self.unknown_username_cache is not None:
+            if await self.unknown_username_cache.is_unknown(username):
+                self.logger.debug("Логин найден в негативном кэше")
+                return None
+            # Читается до SELECT, чтобы заметить регистрацию во время поиска
+            generation = await self.unknown_username_cache.generation()
+        try:
+            async with self.session_factory() as session:
+                return await UserDataAccessLayer(session).get_user_by_username(username)
+        except NotFoundException:
+            if self.unknown_username_cache is not None:
+                await self.unknown_username_cache.remember(username, generation)
+            return None
+
+    async def _pad_response(self, started: float) -> None:
+        """Выравнивание времени ответа, чтобы не раскрывать существование логина"""
+        remaining = settings.login_min_response_ms / 1000 - (time.monotonic() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
 
     def validations_token_type(self, payload, token_type):
         self.logger.debug(f"Проверка типа токена: {token_type}")
@@ -99,18 +204,54 @@ class AuthService(LoggerMixin):
             self.logger.error("Отсутствует индентификатор пользователя: ID")
             raise TokenValidationsException(
                 "Отсутствует идентификатор пользователя")
+        if self.principal_cache is not None:
+            principal = await self.principal_cache.get(id)
+            if principal is not None:
+                return {"user": principal, "payload": payload}
         user = await self.user_dal.get_user_by_id(id)
         if not user:
             self.logger.warning(f"Пользователь не найден для ID: {id}")
             raise NotFoundException("Такого пользователя не существует!")
-        return {"user": user, "payload": payload}
+        principal = CurrentUser.model_validate(user)
+        if self.principal_cache is not None:
+            await self.principal_cache.set(principal)
+        return {"user": principal, "payload": payload}
+
+    def get_claims_user(self, payload: dict) -> ClaimsUser:
+        self.logger.debug("Получение пользователя из claims токена")
+        try:
+            return ClaimsUser(
+                id=payload["sub"],
+                username=payload["username"],
+                email=payload["email"]
+            )
+        except (KeyError, ValueError):
+            self.logger.warning("В токене нет необходимых claims пользователя")
+            raise TokenValidationsException(
+                "Токен не содержит данных пользователя")
 
     async def validate_token(self, token: str, token_type: str):
         self.logger.info(f"Валидация токена типа: {token_type}")
+        payload = self.decode_token(token, token_type)
+        if token_type == REFRESH_TOKEN_TYPE:
+            await self.validate_refresh_not_revoked(payload)
+        return await self.get_user_by_token_sub(payload=payload)
+
+    async def validate_refresh_not_revoked(self, payload: dict) -> None:
+        jti = payload.get(TOKEN_ID_FIELD)
+        if not jti:
+            self.logger.warning("Refresh токен без идентификатора jti")
+            raise TokenValidationsException(
+                "Refresh токен устарел, выполните вход заново")
+        if await self.refresh_store.is_revoked(jti):
+            self.logger.warning("Предъявлен отозванный refresh токен")
+            raise TokenValidationsException("Refresh токен отозван")
+
+    def decode_token(self, token: str, token_type: str) -> dict:
         try:
             payload = self.jwt_manager.decode_jwt(token=token)
             self.validations_token_type(payload, token_type)
-            return await self.get_user_by_token_sub(payload=payload)
+            return payload
         except ExpiredSignatureError:
             self.logger.warning("Срок действия токена истек")
             raise TokenValidationsException("Срок действия токена истек")
@@ -133,7 +274,7 @@ class AuthService(LoggerMixin):
         jwt_payload.update(token_data)
         return self.jwt_manager.encode_jwt(payload=jwt_payload, expire_minutes=expire_minutes, expire_timedelta=expire_timedelta)
 
-    def create_access_token(self, user: User) -> str:
+    def create_access_token(self, user: User | CurrentUser) -> str:
         self.logger.info(f"Создание access токена для пользователя: {user.username}")
         payload_jwt = {
             "sub": str(user.id),
@@ -146,40 +287,89 @@ class AuthService(LoggerMixin):
             expire_minutes=settings.access_token_expire_minutes)
         return access_token
 
-    def create_refresh_token(self, user: User):
+    async def create_refresh_token(self, user: User | CurrentUser):
         self.logger.info(f"Создание refresh токена для пользователя: {user.username}")
+        jti = uuid.uuid4().hex
+        expire_timedelta = timedelta(days=settings.refresh_token_expire_days)
         payload_jwt = {
             "sub": str(user.id),
+            TOKEN_ID_FIELD: jti,
         }
         refresh_token = self.create_jwt(
             token_type=REFRESH_TOKEN_TYPE,
             token_data=payload_jwt,
-            expire_timedelta=timedelta(days=settings.refresh_token_expire_days)
+            expire_timedelta=expire_timedelta
         )
+        await self.refresh_store.add(
+            user.id, jti, time.time() + expire_timedelta.total_seconds())
         return refresh_token
 
+    async def rotate_refresh_token(self, user: User | CurrentUser, payload: dict) -> str:
+        """Гашение предъявленного refresh токена и выпуск нового"""
+        self.logger.info(f"Ротация refresh токена пользователя: {user.username}")
+        if not await self.refresh_store.consume(user.id, payload[TOKEN_ID_FIELD]):
+            raise TokenValidationsException("Refresh токен уже использован")
+        return await self.create_refresh_token(user)
+
+    async def revoke_refresh_token(self, user: User | CurrentUser, payload: dict) -> None:
+        self.logger.info(f"Отзыв refresh токена пользователя: {user.username}")
+        await self.refresh_store.revoke(
+            user.id, payload[TOKEN_ID_FIELD], payload["exp"])
+
 
 # Dependency для получения сервиса
 def get_auth_service(
-        db_session: Annotated[AsyncSession, Depends(get_db)],
-        jwt_manager: Annotated[JWTManager, Depends(get_jwt_manager)]) -> AuthService:
+        session_factory: Annotated[Callable[[], AsyncSession], Depends(get_db_session_factory)],
+        jwt_manager: Annotated[JWTManager, Depends(get_jwt_manager)],
+        password_hasher: Annotated[AsyncPasswordHasher, Depends(get_password_hasher)],
+        principal_cache: Annotated[PrincipalCache, Depends(get_principal_cache)],
+        refresh_store: Annotated[RefreshTokenStore, Depends(get_refresh_token_store)],
+        unknown_username_cache: Annotated[UnknownUsernameCache, Depends(get_unknown_username_cache)]) -> AuthService:
+    return AuthService(
+        db_session=None,
+        jwt_manager=jwt_manager,
+        password_hasher=password_hasher,
+        principal_cache=principal_cache,
+        refresh_store=refresh_store,
+        unknown_username_cache=unknown_username_cache,
+        session_factory=session_factory
+    )
+
+
+def get_principal_auth_service(
+        db_session: Annotated[AsyncSession, Depends(get_read_db)],
+        jwt_manager: Annotated[JWTManager, Depends(get_jwt_manager)],
+        principal_cache: Annotated[PrincipalCache, Depends(get_principal_cache)],
+        refresh_store: Annotated[RefreshTokenStore, Depends(get_refresh_token_store)]) -> AuthService:
+    """Сервис для проверки токена и поиска пользователя на реплике чтения"""
     return AuthService(
         db_session=db_session,
-        jwt_manager=jwt_manager
+        jwt_manager=jwt_manager,
+        principal_cache=principal_cache,
+        refresh_store=refresh_store
     )
 
 
+def get_token_auth_service(
+        jwt_manager: Annotated[JWTManager, Depends(get_jwt_manager)]) -> AuthService:
+    """Сервис только для проверки токенов, без сессии БД"""
+    return AuthService(db_session=None, jwt_manager=jwt_manager)
+
+
 class UserGetterFromToken:
-    def __init__(self, token_type: str):
+    def __init__(self, token_type: str, with_payload: bool = False):
         self.token_type = token_type
+        self.with_payload = with_payload
 
     async def __call__(
         self,
         token: Annotated[str, Depends(oauth2_schema)],
-        auth_service: Annotated[AuthService, Depends(get_auth_service)]
+        auth_service: Annotated[AuthService, Depends(get_principal_auth_service)]
     ):
         try:
             token_data = await auth_service.validate_token(token, self.token_type)
+            if self.with_payload:
+                return token_data
             return token_data["user"]
         except (NotFoundException, TokenValidationsException) as e:
             raise HTTPException(
@@ -188,8 +378,36 @@ class UserGetterFromToken:
                 headers={"WWW-Authenticate": "Bearer"})
 
 
+class ClaimsGetterFromToken:
+    """
+    Пользователь из проверенных claims access-токена без запроса к БД.
+
+    Подходит для маршрутов чтения, которым достаточно sub, username и email.
+    Данные могут устареть не более чем на access_token_expire_minutes.
+    """
+
+    def __init__(self, token_type: str):
+        self.token_type = token_type
+
+    async def __call__(
+        self,
+        token: Annotated[str, Depends(oauth2_schema)],
+        auth_service: Annotated[AuthService, Depends(get_token_auth_service)]
+    ) -> ClaimsUser:
+        try:
+            payload = auth_service.decode_token(token, self.token_type)
+            return auth_service.get_claims_user(payload)
+        except TokenValidationsException as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=str(e),
+                headers={"WWW-Authenticate": "Bearer"})
+
+
 get_current_users = UserGetterFromToken(ACCESS_TOKEN_TYPE)
 get_current_users_refresh = UserGetterFromToken(REFRESH_TOKEN_TYPE)
+get_refresh_token_data = UserGetterFromToken(REFRESH_TOKEN_TYPE, with_payload=True)
+get_current_users_claims = ClaimsGetterFromToken(ACCESS_TOKEN_TYPE)
 
 # Dependenсy для получения текущего пользователя
 
@@ -0,0 +1,211 @@
+import hashlib
+import ipaddress
+from typing import Annotated
+
+from fastapi import Request
+from fastapi.params import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.metrics import metrics
+from app.db.session import get_redis
+from app.exceptions import TooManyRequestsException
+from app.utils.mixins import LoggerMixin
+
+
+# Два token bucket (значение из запроса и IP) проверяются и списываются атомарно.
+# Токен списывается только если оба bucket не пусты.
+# Возвращает {разрешено, retry_after в секундах, кем ограничено: 1 значение, 2 IP, 3 оба}
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local allowed = 1
+local retry_after = 0
+local limited_by = 0
+local state = {}
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        allowed = 0
+        limited_by = limited_by + i
+        retry_after = math.max(retry_after, math.ceil((1 - tokens) / rate))
+    end
+    state[i] = {tokens, capacity, rate}
+end
+
+for i = 1, 2 do
+    local tokens = state[i][1]
+    if allowed == 1 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(state[i][2] / state[i][3]) + 1)
+end
+
+return {allowed, retry_after, limited_by}
+"""
+
+
+# Ключ bucket по IP, когда сервер не передал адрес клиента
+UNKNOWN_CLIENT = "unknown"
+
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy, strict=False) for proxy in settings.trusted_proxies
+]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    IP клиента для ограничений по адресу
+
+    X-Forwarded-For учитывается, только если соединение пришло от доверенного
+    прокси: берётся крайний правый адрес не из trusted_proxies, левее клиент
+    может подставить что угодно. Некоторые ASGI серверы и тестовые клиенты
+    не передают адрес, такие запросы делят bucket UNKNOWN_CLIENT.
+    """
+    peer = request.client.host if request.client else None
+    if not peer:
+        return UNKNOWN_CLIENT
+    if not _is_trusted_proxy(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for address in reversed(forwarded.split(",")):
+        address = address.strip()
+        if address and not _is_trusted_proxy(address):
+            return address
+    return peer
+
+
+class TokenBucketThrottle(LoggerMixin):
+    """
+    Ограничение запросов двумя token bucket: по значению из запроса и по IP.
+
+    Оба bucket проверяются и списываются одним скриптом в Redis. При
+    недоступности Redis запрос не блокируется. Наследники задают префикс
+    ключей и метрик, название ограничиваемого значения и текст ошибки.
+    """
+    _prefix: str
+    _subject: str
+    _message: str
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        subject_capacity: int,
+        subject_per_minute: float,
+        ip_capacity: int,
+        ip_per_minute: float,
+    ) -> None:
+        self.redis_client = redis_client
+        self.subject_capacity = subject_capacity
+        self.subject_rate = subject_per_minute / 60
+        self.ip_capacity = ip_capacity
+        self.ip_rate = ip_per_minute / 60
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _subject_key(self, subject: str) -> str:
+        digest = hashlib.blake2b(
+            subject.lower().encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self._prefix}:{self._subject}:{digest}"
+
+    def _ip_key(self, client_ip: str) -> str:
+        return f"{self._prefix}:ip:{client_ip}"
+
+    async def check(self, subject: str, client_ip: str) -> None:
+        """
+        Списание попытки
+
+        :param subject: Ограничиваемое значение из запроса
+        :param client_ip: IP клиента
+        :raises TooManyRequestsException: Если лимит исчерпан
+        """
+        try:
+            allowed, retry_after, limited_by = await self._script(
+                keys=[self._subject_key(subject), self._ip_key(client_ip)],
+                args=[self.subject_capacity, self.subject_rate,
+                      self.ip_capacity, self.ip_rate]
+            )
+        except RedisError as e:
+            self.logger.warning(
+                "Ограничение запросов недоступно",
+                extra={"throttle": self._prefix, "error": str(e)})
+            return
+
+        if allowed:
+            metrics.increment(f"{self._prefix}_allowed")
+            return
+
+        if limited_by & 1:
+            metrics.increment(f"{self._prefix}_limited_{self._subject}")
+        if limited_by & 2:
+            metrics.increment(f"{self._prefix}_limited_ip")
+        self.logger.warning(
+            "Превышен лимит попыток",
+            extra={
+                "throttle": self._prefix,
+                self._subject: subject,
+                "client_ip": client_ip,
+                "retry_after": retry_after
+            }
+        )
+        raise TooManyRequestsException(self._message, retry_after=int(retry_after))
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """
+    Ограничение попыток входа по логину и IP клиента.
+
+    Проверка выполняется до обращения к БД и bcrypt, поэтому перебор
+    паролей не может занять все ядра хэшированием.
+    """
+    _prefix = "login_throttle"
+    _subject = "username"
+    _message = "Слишком много попыток входа, повторите позже"
+
+
+class AvailabilityThrottle(TokenBucketThrottle):
+    """
+    Ограничение проверок занятости логина и email.
+
+    Без него /auth/available/ позволял бы перебором узнать, какие логины
+    существуют. Bucket по IP ограничивает перебор, bucket по значению -
+    повторные проверки одного логина или email.
+    """
+    _prefix = "availability_throttle"
+    _subject = "value"
+    _message = "Слишком много проверок, повторите позже"
+
+
+def get_login_throttle(redis_client: Annotated[Redis, Depends(get_redis)]) -> LoginThrottle:
+    return LoginThrottle(
+        redis_client=redis_client,
+        subject_capacity=settings.login_throttle_username_capacity,
+        subject_per_minute=settings.login_throttle_username_per_minute,
+        ip_capacity=settings.login_throttle_ip_capacity,
+        ip_per_minute=settings.login_throttle_ip_per_minute,
+    )
+
+
+def get_availability_throttle(redis_client: Annotated[Redis, Depends(get_redis)]) -> AvailabilityThrottle:
+    return AvailabilityThrottle(
+        redis_client=redis_client,
+        subject_capacity=settings.availability_throttle_value_capacity,
+        subject_per_minute=settings.availability_throttle_value_per_minute,
+        ip_capacity=settings.availability_throttle_ip_capacity,
+        ip_per_minute=settings.availability_throttle_ip_per_minute,
+    )
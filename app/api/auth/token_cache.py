@@ -0,0 +1,77 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.utils.mixins import LoggerMixin
+
+
+class VerifiedTokenCache(LoggerMixin):
+    """
+    Ограниченный LRU-кэш проверенных payload JWT.
+
+    Ключ - SHA-256 от токена, запись живёт до exp токена. Повторный
+    запрос с тем же токеном не выполняет проверку подписи RSA.
+    """
+
+    def __init__(self, max_size: int = 10000) -> None:
+        """
+        :param max_size: Максимальное количество токенов в кэше
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: bytes) -> bytes:
+        return hashlib.sha256(token).digest()
+
+    def get(self, token: bytes) -> dict | None:
+        """
+        Получение payload из кэша
+
+        :param token: JWT-токен
+        :return: Копия payload или None, если токена нет или он истёк
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, expire = entry
+        if time.time() >= expire:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(payload)
+
+    def set(self, token: bytes, payload: dict) -> None:
+        """
+        Сохранение проверенного payload, токены без exp не кэшируются
+
+        :param token: JWT-токен
+        :param payload: Проверенный payload
+        """
+        expire = payload.get("exp")
+        if expire is None:
+            return
+        key = self._digest(token)
+        self._entries[key] = (dict(payload), float(expire))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
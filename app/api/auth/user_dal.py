@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.user import User
 from uuid import UUID
@@ -53,6 +53,37 @@ class UserDataAccessLayer(LoggerMixin, DataMaskinMixinEmail):
         )
         return user
 
+    async def update_user_flags(self, id: UUID, **flags: bool) -> User:
+        self.logger.info("Изменение флагов пользователя",
+                         extra={"id": id, "flags": flags})
+        query = select(User).where(User.id == id)
+        result = await self.db_session.execute(query)
+        user = result.scalar_one_or_none()
+        if not user:
+            self.logger.error(
+                "Пользователя не был найден по id",
+                extra={"id": id}
+            )
+            raise NotFoundException(f"Пользователь с id={id} не найден!")
+        for name, value in flags.items():
+            setattr(user, name, value)
+        await self.db_session.flush()
+        return user
+
+    async def username_exists(self, username: str) -> bool:
+        self.logger.info("Проверка занятости логина",
+                         extra={"username": username})
+        query = select(exists().where(User.username == username))
+        result = await self.db_session.execute(query)
+        return bool(result.scalar())
+
+    async def email_exists(self, email: str) -> bool:
+        self.logger.info("Проверка занятости email",
+                         extra={"email": self.mask_email(email)})
+        query = select(exists().where(User.email == email))
+        result = await self.db_session.execute(query)
+        return bool(result.scalar())
+
     async def get_user_by_username(self, username):
         self.logger.info("Попытка найти пользователя в базе данных по username",
                          extra={"username": username}
@@ -61,7 +92,7 @@ class UserDataAccessLayer(LoggerMixin, DataMaskinMixinEmail):
         result = await self.db_session.execute(query)
         user = result.scalar_one_or_none()
         if not user:
-            self.logger.error(
+            self.logger.warning(
                 "Пользователь не был найден в базе данных по username",
                 extra={"username": username})
             raise NotFoundException(
@@ -1,8 +1,84 @@
+import hashlib
+import hmac
 from datetime import datetime, timedelta, timezone
 import jwt
 from pathlib import Path
+from typing import Any
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.exceptions import InvalidSignatureError
 from app.config import settings
+from app.core.metrics import metrics
 from app.utils.mixins import LoggerMixin
+from .token_cache import VerifiedTokenCache
+
+
+# Алгоритм подписи определяется типом ключа
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+def get_key_algorithm(key: Any) -> str:
+    """
+    Алгоритм JWT для ключа cryptography
+
+    :param key: Приватный или публичный ключ
+    :return: Название алгоритма JWT
+    :raises ValueError: Если тип ключа не поддерживается
+    """
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        algorithm = EC_CURVE_ALGORITHMS.get(key.curve.name)
+        if algorithm:
+            return algorithm
+    raise ValueError(f"Неподдерживаемый тип ключа: {type(key).__name__}")
+
+
+class JWTKeySet:
+    """Неизменяемый набор разобранных ключей: ключ подписи и публичные ключи по kid"""
+
+    def __init__(self, signing_kid: str, private_key: Any, public_keys: dict[str, Any]):
+        self.signing_kid = signing_kid
+        self.private_key = private_key
+        self.public_keys = public_keys
+        self.algorithms = {
+            kid: get_key_algorithm(key) for kid, key in public_keys.items()
+        }
+        self._derived_secrets: dict[str, bytes] = {}
+
+    def derive_secret(self, purpose: str) -> bytes:
+        """
+        Секрет для другой подписи, производный от приватного ключа
+
+        HMAC-SHA256 от назначения на ключе DER приватного ключа: одинаков у
+        всех воркеров с этим ключом и не раскрывает сам ключ.
+
+        :param purpose: Назначение секрета, у разных назначений разные секреты
+        """
+        secret = self._derived_secrets.get(purpose)
+        if secret is None:
+            key_bytes = self.private_key.private_bytes(
+                serialization.Encoding.DER,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption())
+            secret = hmac.new(key_bytes, purpose.encode("utf-8"), hashlib.sha256).digest()
+            self._derived_secrets[purpose] = secret
+        return secret
+
+    def find_kid(self, algorithm: str | None) -> str | None:
+        """kid для токена без заголовка kid: активный ключ или первый ключ того же алгоритма"""
+        if self.algorithms.get(self.signing_kid) == algorithm:
+            return self.signing_kid
+        for kid, key_algorithm in self.algorithms.items():
+            if key_algorithm == algorithm:
+                return kid
+        return None
 
 
 class JWTManager(LoggerMixin):
@@ -11,18 +87,76 @@ class JWTManager(LoggerMixin):
             private_key_path: Path,
             public_key_path: Path,
             algorithm: str,
+            key_id: str = "main",
+            verification_key_paths: dict[str, Path] | None = None,
+            token_cache: VerifiedTokenCache | None = None,
     ):
         """
         Инициализация менеджера JWT.
 
+        Ключи читаются с диска и разбираются один раз, в JWT передаются
+        готовые объекты cryptography.
+
         :param private_key_path: Путь к файлу с приватным ключом.
         :param public_key_path: Путь к файлу с публичным ключом.
-        :param algorithm: Алгоритм шифрования.
+        :param algorithm: Алгоритм подписи новых токенов (RS256, ES256, EdDSA).
+        :param key_id: Идентификатор (kid) активного ключа подписи.
+        :param verification_key_paths: Дополнительные публичные ключи по kid.
+        :param token_cache: Кэш проверенных токенов.
         """
 
-        self.private_key = private_key_path.read_text()
-        self.public_key = public_key_path.read_text()
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
         self.algorithm = algorithm
+        self.key_id = key_id
+        self.verification_key_paths = verification_key_paths or {}
+        self.token_cache = token_cache
+        self._keys = self._load_keys()
+
+    def _load_keys(self) -> JWTKeySet:
+        self.logger.info("Загрузка ключей JWT", extra={"kid": self.key_id})
+        private_key = serialization.load_pem_private_key(
+            self.private_key_path.read_bytes(), password=None)
+        public_keys = {
+            kid: serialization.load_pem_public_key(path.read_bytes())
+            for kid, path in self.verification_key_paths.items()
+        }
+        public_keys[self.key_id] = serialization.load_pem_public_key(
+            self.public_key_path.read_bytes())
+        key_algorithm = get_key_algorithm(private_key)
+        if key_algorithm != self.algorithm:
+            raise ValueError(
+                f"Ключ подписи предназначен для {key_algorithm}, а настроен {self.algorithm}")
+        return JWTKeySet(self.key_id, private_key, public_keys)
+
+    def reload_keys(self) -> None:
+        """
+        Перечитывает ключи с диска (ротация).
+
+        Новый набор подменяет старый одним присваиванием, поэтому запросы,
+        которые уже взяли старый набор, завершатся с ним. При ошибке
+        загрузки продолжает работать прежний набор ключей.
+        """
+        try:
+            self._keys = self._load_keys()
+        except Exception as e:
+            self.logger.error(
+                "Ошибка перезагрузки ключей JWT, используется прежний набор",
+                extra={"error": str(e)},
+                exc_info=True
+            )
+            raise
+        if self.token_cache is not None:
+            # Токены, подписанные отозванными ключами, должны пройти проверку заново
+            self.token_cache.clear()
+        self.logger.info(
+            "Ключи JWT перезагружены",
+            extra={"kids": list(self._keys.public_keys)}
+        )
+
+    def derive_secret(self, purpose: str) -> bytes:
+        """Секрет, производный от активного ключа подписи; меняется при ротации ключа"""
+        return self._keys.derive_secret(purpose)
 
     def encode_jwt(self, payload: dict, expire_minutes: int, expire_timedelta: timedelta | None = None):
         """
@@ -32,6 +166,7 @@ class JWTManager(LoggerMixin):
         :return: Закодированный JWT-токен.
         """
         self.logger.debug("Кодирование JWT токена")
+        keys = self._keys
         now = datetime.now(timezone.utc)
         if expire_timedelta:
             expire = now + expire_timedelta
@@ -41,8 +176,9 @@ class JWTManager(LoggerMixin):
         to_encode.update(exp=expire, iat=now)
         encoded_jwt = jwt.encode(
             to_encode,
-            self.private_key,
-            algorithm=self.algorithm
+            keys.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": keys.signing_kid}
         )
         return encoded_jwt
 
@@ -50,6 +186,12 @@ class JWTManager(LoggerMixin):
         """
         Декодирует JWT-токен.
 
+        Ключ и алгоритм проверки выбираются по заголовку kid, поэтому
+        во время миграции принимаются токены всех настроенных ключей
+        (например, старые RS256 и новые EdDSA). Токены без kid проверяются
+        ключом того же алгоритма, предпочтительно активным. Уже проверенные
+        токены берутся из кэша без проверки подписи.
+
         :param token: JWT-токен для декодирования.
         :return: Декодированные данные.
         """
@@ -58,17 +200,51 @@ class JWTManager(LoggerMixin):
         if isinstance(token, str):
             token = token.encode("utf-8")
 
+        if self.token_cache is not None:
+            cached = self.token_cache.get(token)
+            if cached is not None:
+                return cached
+
+        keys = self._keys
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid") or keys.find_kid(header.get("alg"))
+        public_key = keys.public_keys.get(kid)
+        if public_key is None:
+            self.logger.warning("Неизвестный kid токена", extra={"kid": kid})
+            raise InvalidSignatureError(f"Неизвестный ключ подписи {kid!r}")
+
         decoded_jwt = jwt.decode(
             token,
-            self.public_key,
-            algorithms=[self.algorithm]
+            public_key,
+            algorithms=[keys.algorithms[kid]]
         )
+        if self.token_cache is not None:
+            self.token_cache.set(token, decoded_jwt)
         return decoded_jwt
 
 
-def get_jwt_manager() -> JWTManager:
-    return JWTManager(
+_jwt_manager: JWTManager | None = None
+
+
+def init_jwt_manager() -> JWTManager:
+    """Создание менеджера JWT процесса, вызывается при старте приложения"""
+    global _jwt_manager
+    token_cache = None
+    if settings.jwt_token_cache_size > 0:
+        token_cache = VerifiedTokenCache(max_size=settings.jwt_token_cache_size)
+        metrics.register_gauge("jwt_token_cache", token_cache.stats)
+    _jwt_manager = JWTManager(
         private_key_path=settings.private_key_path,
         public_key_path=settings.public_key_path,
         algorithm=settings.algorithm,
+        key_id=settings.jwt_key_id,
+        verification_key_paths=settings.jwt_verification_keys,
+        token_cache=token_cache,
     )
+    return _jwt_manager
+
+
+def get_jwt_manager() -> JWTManager:
+    if _jwt_manager is None:
+        return init_jwt_manager()
+    return _jwt_manager
@@ -1,17 +1,18 @@
 from uuid import UUID
-from fastapi import APIRouter, status, HTTPException
+from fastapi import APIRouter, status, HTTPException, Request, Query
 from fastapi.params import Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
-from .schemas import RegisterUsers, ShowUsers, DeleteUserShow, TokenInfo
-from .service import UserService, AuthService, get_auth_service, get_current_users_refresh, get_current_users
-from app.exceptions import UniqueError, NotNullConstraintViolationException, NotFoundException
-from app.db.models.user import User
+from .schemas import RegisterUsers, ShowUsers, DeleteUserShow, TokenInfo, CurrentUser, AvailabilityShow, UpdateUserFlags
+from .availability import AvailabilityService, get_availability_service
+from .throttling import AvailabilityThrottle, LoginThrottle, get_availability_throttle, get_client_ip, get_login_throttle
+from .service import UserService, AuthService, get_auth_service, get_current_users, get_current_users_claims, get_refresh_token_data
+from app.exceptions import UniqueError, NotNullConstraintViolationException, NotFoundException, PasswordHasherBusyException, PermissionsError, TokenValidationsException, TooManyRequestsException
 from app.utils.mixins import DataMaskinMixinEmail
 
 import logging
 
-from typing import Annotated
+from typing import Annotated, Optional
 
 
 router = APIRouter()
@@ -59,6 +60,15 @@ async def create_users(body: RegisterUsers, user_service: Annotated[UserService,
         )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except PasswordHasherBusyException as e:
+        logger.warning(
+            "Ошибка регистрации: пул хэширования паролей перегружен",
+            extra={"username": body.username}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"})
     except Exception as e:
         logger.critical(
             "Критическая ошибка при регистрации пользователя",
@@ -73,6 +83,27 @@ async def create_users(body: RegisterUsers, user_service: Annotated[UserService,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Внутреняя ошибка сервера")
 
 
+@router.get("/available/", response_model=AvailabilityShow, response_model_exclude_none=True)
+async def check_availability(
+        request: Request,
+        availability_service: Annotated[AvailabilityService, Depends(get_availability_service)],
+        availability_throttle: Annotated[AvailabilityThrottle, Depends(get_availability_throttle)],
+        username: Optional[str] = Query(None),
+        email: Optional[str] = Query(None)) -> AvailabilityShow:
+    if username is None and email is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Укажите username или email")
+    try:
+        await availability_throttle.check(f"{username or ''}:{email or ''}", get_client_ip(request))
+    except TooManyRequestsException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)})
+    availability = await availability_service.check(username=username, email=email)
+    return AvailabilityShow(**availability)
+
+
 @router.delete("/delete_user/{user_id}", response_model=DeleteUserShow, status_code=status.HTTP_200_OK)
 async def delete_users(user_id: UUID, user_service: Annotated[UserService, Depends()]):
     logger = logging.getLogger(__name__)
@@ -103,24 +134,62 @@ async def delete_users(user_id: UUID, user_service: Annotated[UserService, Depen
                             detail="Пользователь не найден!")
 
 
+@router.patch("/users/{user_id}/flags/", response_model=CurrentUser)
+async def update_user_flags(
+        user_id: UUID,
+        body: UpdateUserFlags,
+        current_user: Annotated[CurrentUser, Depends(get_current_users)],
+        user_service: Annotated[UserService, Depends()]) -> CurrentUser:
+    logger = logging.getLogger(__name__)
+    logger.info(
+        "Получен запрос на изменение флагов пользователя",
+        extra={"user_id": user_id, "flags": body.model_dump(exclude_none=True)}
+    )
+    try:
+        user = await user_service.update_user_flags(
+            user_id, current_user,
+            is_active=body.is_active,
+            is_superuser=body.is_superuser)
+        return CurrentUser.model_validate(user)
+    except PermissionsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except NotFoundException:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Пользователь не найден!")
+
+
 @router.post("/login/", response_model=TokenInfo)
-async def login_user(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], auth_service: Annotated[AuthService, Depends(get_auth_service)]) -> TokenInfo:
+async def login_user(
+        request: Request,
+        form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+        auth_service: Annotated[AuthService, Depends(get_auth_service)],
+        login_throttle: Annotated[LoginThrottle, Depends(get_login_throttle)]) -> TokenInfo:
     logger = logging.getLogger(__name__)
     logger.info("Получен запрос на аунтентификацию пользователя")
+    try:
+        await login_throttle.check(form_data.username, get_client_ip(request))
+    except TooManyRequestsException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)})
     try:
         user = await auth_service.authenticate_user(form_data.username, form_data.password)
-    except NotFoundException as e:
-        logger.warning("Неудачная попытка входа, пользователя не найден!", extra={
+    except PasswordHasherBusyException as e:
+        logger.warning("Вход отклонён: пул хэширования паролей перегружен", extra={
                        "username": form_data.username})
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Пользователь не найден!")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"})
     if not user:
         logger.warning("Неудачная попытка входа, неверный логин или пароль", extra={
                        "username": form_data.username})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный логин или пароль")
     access_token = auth_service.create_access_token(user)
-    refresh_token = auth_service.create_refresh_token(user)
+    refresh_token = await auth_service.create_refresh_token(user)
 
     logger.info(f"Успешный вход пользователя: {form_data.username}")
 
@@ -128,14 +197,30 @@ async def login_user(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 
 
 @router.post("/refresh/", response_model=TokenInfo, response_model_exclude_none=True)
-def auth_refresh_jwt(user: Annotated[User, Depends(get_current_users_refresh)], auth_service: Annotated[AuthService, Depends(get_auth_service)]):
+async def auth_refresh_jwt(token_data: Annotated[dict, Depends(get_refresh_token_data)], auth_service: Annotated[AuthService, Depends(get_auth_service)]):
     logger = logging.getLogger(__name__)
     logger.info("Получен запрос на обновение ACCESS токена")
+    user = token_data["user"]
+    try:
+        refresh_token = await auth_service.rotate_refresh_token(user, token_data["payload"])
+    except TokenValidationsException as e:
+        logger.warning("Отклонено обновление токена", extra={"user_id": user.id})
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"})
     access_token = auth_service.create_access_token(user)
     logger.info("Токен успешно обновлен")
-    return TokenInfo(access_token=access_token)
+    return TokenInfo(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/logout/", status_code=status.HTTP_204_NO_CONTENT)
+async def auth_logout(token_data: Annotated[dict, Depends(get_refresh_token_data)], auth_service: Annotated[AuthService, Depends(get_auth_service)]):
+    logger = logging.getLogger(__name__)
+    logger.info("Получен запрос на выход пользователя")
+    await auth_service.revoke_refresh_token(token_data["user"], token_data["payload"])
 
 
 @router.get("/users/me/", response_model=ShowUsers)
-def auth_user_check_self_info(user: ShowUsers = Depends(get_current_users)) -> ShowUsers:
+def auth_user_check_self_info(user: ShowUsers = Depends(get_current_users_claims)) -> ShowUsers:
     return user
@@ -4,7 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 from app.db.models.user import User
-from app.db.session import get_db
+from app.db.session import get_read_db
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from app.db.models.communities import Communities
 from app.utils.mixins import LoggerMixin
 from abc import ABC, abstractmethod
@@ -44,13 +45,14 @@ class CommunityDataAccessLayer(ICommunityRepository, LoggerMixin):
         )
 
         self.db_session.add(new_community)
-        await self.db_session.commit()
+        await self.db_session.flush()
         self.logger.info(f"Сообщество было создано в БД {new_community.title}")
         return new_community
 
     async def get_all(self):
         self.logger.info("Получение все сообщеста из БД")
-        query = select(Communities).order_by(desc(Communities.date_create))
+        query = select(Communities).order_by(
+            desc(Communities.date_create), desc(Communities.id))
         result = await self.db_session.execute(query)
         return list(result.scalars().all())
 
@@ -61,5 +63,10 @@ class CommunityDataAccessLayer(ICommunityRepository, LoggerMixin):
         return result.scalars().all()
 
 
-def get_community_dal(db_session: AsyncSession = Depends(get_db)) -> ICommunityRepository:
+def get_community_dal(uow: UnitOfWork = Depends(get_unit_of_work)) -> ICommunityRepository:
+    return CommunityDataAccessLayer(uow.session)
+
+
+def get_community_read_dal(db_session: AsyncSession = Depends(get_read_db)) -> ICommunityRepository:
+    """DAL для чтения без единицы работы: реплика, после записи в запросе - primary"""
     return CommunityDataAccessLayer(db_session)
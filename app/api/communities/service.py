@@ -6,32 +6,36 @@ from fastapi.params import Depends
 from fastapi import UploadFile
 
 from redis import Redis
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .communities_dal import CommunityDataAccessLayer, get_community_dal, ICommunityRepository
+from .communities_dal import CommunityDataAccessLayer, get_community_dal, get_community_read_dal, ICommunityRepository
 from .schemas import CreateCommunities, CommunityAll, CommunityAllAdmin
 
 
-from app.db.session import get_db, get_redis
-from app.db.models.user import User
+from app.db.routing import ROUTING_STATE
+from app.db.session import async_read_session, get_read_db, get_redis
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from app.db.models.communities import Communities
 from app.api.auth.service import get_current_users
+from app.api.auth.schemas import CurrentUser, ClaimsUser
 from app.resources.image_service import ImageService, get_image_service
 from app.utils.mixins import LoggerMixin
-from app.core.pagination import create_paginated_query, PaginatedResponse
+from app.core.cache import VersionedCache
+from app.core.enums import PaginationStrategy
+from app.core.pagination import create_paginated_query, create_cursor_paginated_query, adjust_cached_count, PaginatedResponse, CursorPaginatedResponse
 
 
 class CommunityService(LoggerMixin):
     def __init__(
         self,
-        db_session: AsyncSession,
+        uow: UnitOfWork,
         current_user,
         community_dal: ICommunityRepository,
         image_service: ImageService,
         redis_client: Redis
     ):
-        self.db_session = db_session
+        self.uow = uow
         self.current_user = current_user
         self.community_dal = community_dal
         self.image_service = image_service
@@ -53,20 +57,18 @@ class CommunityService(LoggerMixin):
         )
         self.logger.info(f"Создано сообщесто {new_community.title}")
 
-        await self._invalide_community_all_cache()  # Инвалидация кэша всех страниц
-        await self._inavlid_cache_admin_community(self.current_user.id)
+        # Инвалидация кэша после фиксации, иначе параллельный запрос
+        # может снова закэшировать данные без нового сообщества
+        admin_id = self.current_user.id
+        self.uow.after_commit(self._invalide_community_all_cache)  # Инвалидация кэша всех страниц
+        self.uow.after_commit(lambda: self._inavlid_cache_admin_community(admin_id))
+        self.uow.after_commit(lambda: adjust_cached_count(
+            self.redis_client, ReadCommunotyService.COUNT_CACHE_KEY, 1))
         return new_community
 
     async def _invalide_community_all_cache(self):
-        """Очистка всех кэша пагинации сообщества"""
-
-        pattern = "community_all_cache_*"
-
-        keys = await self.redis_client.keys(pattern)
-        if keys:
-            await self.redis_client.delete(*keys)
-            self.logger.info(
-                f"Очищено {len(keys)} кэш-ключей пагинации сообщества")
+        """Инвалидация всех страниц пагинации сообщества сменой поколения кэша"""
+        await ReadCommunotyService.get_cache(self.redis_client).invalidate()
 
     async def _inavlid_cache_admin_community(self, id_user):
         if id_user:
@@ -79,44 +81,89 @@ class CommunityService(LoggerMixin):
 class ReadCommunotyService(LoggerMixin):
     """Сервис получения записей"""
     CACHE_TTL = 300  # 5 мин
-
-    def __init__(self, db_session: AsyncSession, redis_client: Any) -> None:
+    CACHE_STALE_TTL = 60  # устаревшая страница отдаётся, пока обновляется в фоне
+    CACHE_NAMESPACE = "community_all"
+    COUNT_CACHE_KEY = "community_count"
+    # Счётчик корректируется только при создании: удаления сообществ в API нет,
+    # удаления мимо сервиса (каскады, правки в БД) исправляются пересчётом по TTL
+    COUNT_CACHE_TTL = 3600
+
+    def __init__(self, db_session: Optional[AsyncSession], redis_client: Any) -> None:
+        """
+        :param db_session: Сессия чтения запроса для страниц по курсору; None вне запроса
+        """
         self.db_session = db_session
         self.redis_client = redis_client
+        self.cache = self.get_cache(redis_client)
+
+    @classmethod
+    def get_cache(cls, redis_client: Any) -> VersionedCache:
+        return VersionedCache(
+            redis_client, cls.CACHE_NAMESPACE, cls.CACHE_TTL, stale_ttl=cls.CACHE_STALE_TTL)
 
-    async def get(self, page: int, size: int):
+    async def get(self, page: int, size: int, strategy: PaginationStrategy = PaginationStrategy.SEPARATE_COUNT):
+        """
+        :param strategy: Способ подсчёта общего количества, по умолчанию точный COUNT
+        """
         self.logger.info(f"Получения сообществ старница {page}")
-        cache_key = f"community_all_cache_{page}_{size}"
+        cache_key = await self.cache.key(page, size, strategy.value)
 
-        cached = await self.redis_client.get(cache_key)
-        if cached:
-            self.logger.info("Получения сообщества из КЭША")
-            data = json.loads(cached)
-            return PaginatedResponse[CommunityAll](**data)
+        async def load() -> str:
+            # Загрузка может пережить запрос (фоновое обновление), поэтому своя сессия
+            async with self._read_session() as session:
+                result = await self._load_page(session, page, size, strategy)
+            self.logger.info("Данные получены напрямую из БД")
+            return result.model_dump_json()
+
+        cached = await self.cache.get_or_load(cache_key, load)
+        return PaginatedResponse[CommunityAll].model_validate_json(cached)
 
+    def _read_session(self) -> AsyncSession:
+        """Сессия чтения с общим для запроса состоянием: после записи в запросе - primary"""
+        state = self.db_session.info.get(ROUTING_STATE) if self.db_session is not None else None
+        return async_read_session(info={ROUTING_STATE: state} if state is not None else {})
+
+    async def _load_page(self, session: AsyncSession, page: int, size: int,
+                         strategy: PaginationStrategy) -> PaginatedResponse[CommunityAll]:
         custom_query = select(Communities).order_by(
-            Communities.date_create.desc())
+            Communities.date_create.desc(), Communities.id.desc())
 
         paginator = create_paginated_query(
-            Communities, page, size, custom_query=custom_query)
-        items, total = await paginator.execute(self.db_session)
-        pages = (total + size - 1) // size
+            Communities, page, size, custom_query=custom_query,
+            strategy=strategy, redis_client=self.redis_client,
+            count_cache_key=self.COUNT_CACHE_KEY, count_cache_ttl=self.COUNT_CACHE_TTL,
+            schema=CommunityAll)
+        items, total = await paginator.execute(session)
+
+        return PaginatedResponse[CommunityAll].build(
+            items, page, size, total=total, has_next=paginator.has_next)
+
+    async def get_by_cursor(self, cursor: Optional[str], size: int) -> CursorPaginatedResponse[CommunityAll]:
+        """
+        Страница сообществ по курсору, без OFFSET
+
+        :raises InvalidCursorException: Если курсор повреждён
+        """
+        self.logger.info("Получение сообществ по курсору")
+        # Не только id: у сообществ, созданных до перехода на UUIDv7, id
+        # случайные (v4) и почти все больше любых v7, поэтому сортировка по id
+        # подняла бы старые записи в начало ленты. Переход на сортировку по id
+        # и удаление ix_communities_date_create_id возможны после перевыпуска
+        # id старых записей
+        custom_query = select(Communities).order_by(
+            Communities.date_create.desc(), Communities.id.desc())
 
-        result = PaginatedResponse[CommunityAll](
+        paginator = create_cursor_paginated_query(
+            Communities, size, cursor=cursor, custom_query=custom_query, schema=CommunityAll)
+        items, next_cursor, prev_cursor = await paginator.execute(self.db_session)
+
+        return CursorPaginatedResponse[CommunityAll](
             items=items,
-            total=total,
-            page=page,
             size=size,
-            pages=pages,
-            next_page=page+1 if page < pages else None,
-            prev_page=page-1 if page > 1 else None
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
         )
 
-        await self.redis_client.setex(cache_key, self.CACHE_TTL, result.model_dump_json())
-
-        self.logger.info("Данные получены напрямую из БД")
-        return result
-
 
 class GetCommunityAllAdmin(LoggerMixin):
     """Получение сообщество которые пользователь создал"""
@@ -127,7 +174,7 @@ class GetCommunityAllAdmin(LoggerMixin):
         self.community_dal = community_dal
         self.redis_client = redis_client
 
-    async def get(self, user: User):
+    async def get(self, user: ClaimsUser):
         self.logger.info(
             f"Получения созданных сообщества пользователя, {user.username}")
         cache_key = f"{self._prefix_cached}:{user.id}"
@@ -148,15 +195,15 @@ class GetCommunityAllAdmin(LoggerMixin):
 
 
 def get_community_service(
-        db_session: Annotated[AsyncSession, Depends(get_db)],
-        current_user: Annotated[User, Depends(get_current_users)],
+        uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+        current_user: Annotated[CurrentUser, Depends(get_current_users)],
         community_dal: Annotated[ICommunityRepository,
                                  Depends(get_community_dal)],
         image_service: Annotated[ImageService, Depends(get_image_service)],
         redis_client: Annotated[Redis, Depends(get_redis)]
 ) -> CommunityService:
     return CommunityService(
-        db_session=db_session,
+        uow=uow,
         current_user=current_user,
         community_dal=community_dal,
         image_service=image_service,
@@ -164,9 +211,9 @@ def get_community_service(
     )
 
 
-def get_community_all(db_session: Annotated[AsyncSession, Depends(get_db)], redis_client: Annotated[Redis, Depends(get_redis)]) -> ReadCommunotyService:
+def get_community_all(db_session: Annotated[AsyncSession, Depends(get_read_db)], redis_client: Annotated[Redis, Depends(get_redis)]) -> ReadCommunotyService:
     return ReadCommunotyService(db_session, redis_client)
 
 
-def get_community_all_admin(community_dal: Annotated[CommunityDataAccessLayer, Depends(get_community_dal)], redis_client: Annotated[Redis, Depends(get_redis)]) -> ReadCommunotyService:
+def get_community_all_admin(community_dal: Annotated[CommunityDataAccessLayer, Depends(get_community_read_dal)], redis_client: Annotated[Redis, Depends(get_redis)]) -> ReadCommunotyService:
     return GetCommunityAllAdmin(community_dal, redis_client)
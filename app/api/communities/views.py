@@ -1,15 +1,16 @@
 
-from fastapi import APIRouter, UploadFile, status, HTTPException, Depends, File, Form
+from fastapi import APIRouter, UploadFile, status, HTTPException, Depends, File, Form, Query
 
 from typing import Annotated, Optional, List
 
 from .schemas import CreateCommunities, CommunityAll, CommunityAllAdmin
 from .service import get_community_service, CommunityService, ReadCommunotyService, GetCommunityAllAdmin, get_community_all, get_community_all_admin
 
-from app.exceptions import InvalidImageExtension, FileSaveError
-from app.core.pagination import PaginationParams, PaginatedResponse
-from app.api.auth.service import get_current_users
-from app.db.models.user import User
+from app.exceptions import InvalidImageExtension, FileSaveError, InvalidCursorException
+from app.core.enums import PaginationStrategy
+from app.core.pagination import PaginationParams, PaginatedResponse, CursorParams, CursorPaginatedResponse
+from app.api.auth.service import get_current_users_claims
+from app.api.auth.schemas import ClaimsUser
 import logging
 
 
@@ -44,10 +45,25 @@ async def create_communities(
 
 
 @router.get("/all_communities/", status_code=status.HTTP_200_OK, response_model=PaginatedResponse[CommunityAll])
-async def get_all_communities(params: PaginationParams = Depends(), read_community_service: ReadCommunotyService = Depends(get_community_all)):
-    return await read_community_service.get(page=params.page, size=params.size)
+async def get_all_communities(
+        params: PaginationParams = Depends(),
+        count: PaginationStrategy = Query(
+            PaginationStrategy.SEPARATE_COUNT,
+            description="Подсчёт total: separate_count и window точные, cached - счётчик в Redis, "
+                        "estimate - оценка планировщика, no_total - без total, только has_next"),
+        read_community_service: ReadCommunotyService = Depends(get_community_all)):
+    return await read_community_service.get(page=params.page, size=params.size, strategy=count)
+
+
+@router.get("/all_communities/cursor/", status_code=status.HTTP_200_OK, response_model=CursorPaginatedResponse[CommunityAll])
+async def get_all_communities_by_cursor(params: CursorParams = Depends(), read_community_service: ReadCommunotyService = Depends(get_community_all)):
+    try:
+        return await read_community_service.get_by_cursor(cursor=params.cursor, size=params.size)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(e))
 
 
 @router.get("/admin_all/communities/", status_code=status.HTTP_200_OK, response_model=list[CommunityAllAdmin])
-async def get_all_commnities_admin(current_user: Annotated[User, Depends(get_current_users)], services: Annotated[GetCommunityAllAdmin, Depends(get_community_all_admin)]):
+async def get_all_commnities_admin(current_user: Annotated[ClaimsUser, Depends(get_current_users_claims)], services: Annotated[GetCommunityAllAdmin, Depends(get_community_all_admin)]):
     return await services.get(current_user)
@@ -4,6 +4,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from app.db.instrumentation import RequestQueryStats, request_query_stats
+
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware для логирование каждого запроса"""
@@ -54,5 +56,37 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         return response
     
 
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """Middleware статистики SQL запроса: заголовок Server-Timing и лог"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def dispatch(self, request: Request, call_next):
+        stats = RequestQueryStats(route=request.url.path)
+        token = request_query_stats.set(stats)
+        try:
+            response: Response = await call_next(request)
+        finally:
+            request_query_stats.reset(token)
+
+        if stats.count:
+            response.headers.append("Server-Timing", stats.server_timing())
+            self.logger.info(
+                "SQL статистика запроса",
+                extra={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "query_count": stats.count,
+                    "db_time": f"{stats.total_time:.4f} sec",
+                    "slowest_time": f"{stats.slowest_time:.4f} sec",
+                    "slowest_statement": (stats.slowest_statement or "")[:200]
+                }
+            )
+
+        return response
+
+
 class CORSMiddleware:
     pass
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from app.db.models.post import Post
 
 from fastapi import Depends
@@ -28,9 +28,9 @@ class PostDataAccessLayer(IPostRepository):
             communities_id=communities_id
         )
         self.db_session.add(post)
-        await self.db_session.commit()
+        await self.db_session.flush()
         return post
 
 
-def get_post_dal(db_session: AsyncSession = Depends(get_db)) -> IPostRepository:
-    return PostDataAccessLayer(db_session=db_session)
+def get_post_dal(uow: UnitOfWork = Depends(get_unit_of_work)) -> IPostRepository:
+    return PostDataAccessLayer(db_session=uow.session)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.core.metrics import metrics
+
+
+router = APIRouter()
+
+
+@router.get("/metrics/", status_code=status.HTTP_200_OK)
+async def get_metrics() -> dict:
+    return metrics.snapshot()
+
+
+@router.get("/ready/", status_code=status.HTTP_200_OK)
+async def get_ready(request: Request, response: Response) -> dict:
+    if not getattr(request.app.state, "ready", False):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "ready"}
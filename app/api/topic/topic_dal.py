@@ -3,7 +3,7 @@ from app.utils.mixins import LoggerMixin
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.topic import Topic
 from fastapi import Depends
-from app.db.session import get_db
+from app.db.unit_of_work import UnitOfWork, get_unit_of_work
 from app.exceptions import UniqueError, DatabaseException
 
 from sqlalchemy.exc import IntegrityError
@@ -26,16 +26,15 @@ class TopicDataAccessLayer(ITopicRepositiry, LoggerMixin):
         try:
             topic = Topic(title=title)
             self.db_session.add(topic)
-            await self.db_session.commit()
+            await self.db_session.flush()
             self.logger.info(f"Тема: {title} была записана в БД")
             return topic
         except IntegrityError as e:
-            await self.db_session.rollback()
             if "duplicate key value violates unique constraint" in str(e.orig):
                 raise UniqueError(f"Тема с название {title} уже существует!")
             else:
                 raise DatabaseException("Ошибка БД")
 
 
-def get_topic_dal(db_session: AsyncSession = Depends(get_db)) -> ITopicRepositiry:
-    return TopicDataAccessLayer(db_session=db_session)
+def get_topic_dal(uow: UnitOfWork = Depends(get_unit_of_work)) -> ITopicRepositiry:
+    return TopicDataAccessLayer(db_session=uow.session)
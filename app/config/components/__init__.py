@@ -2,9 +2,11 @@ from app.config.components.base import BaseConfig
 from app.config.components.db import DatabaseConfig
 from app.config.components.auth import Auth
 from app.config.components.redis import RedisConfig
+from app.config.components.warmup import WarmupConfig
+from app.config.components.pagination import PaginationConfig
 
 
-class ComponentsConfig(BaseConfig, DatabaseConfig, Auth,RedisConfig):
+class ComponentsConfig(BaseConfig, DatabaseConfig, Auth,RedisConfig, WarmupConfig, PaginationConfig):
     pass
 
 
@@ -7,6 +7,52 @@ from app.config.constants import ROOT_DIR
 class Auth(BaseSettings):
     private_key_path: Path = ROOT_DIR / "config" / "certs" / "jwt-private.pem"
     public_key_path: Path = ROOT_DIR / "config" / "certs" / "jwt-public.pem"
-    algorithm: str = "RS256"
+    algorithm: str = "RS256"  # RS256 | ES256 | EdDSA, должен совпадать с типом ключа
+    jwt_key_id: str = "main"  # kid активного ключа подписи
+    # Дополнительные публичные ключи (kid -> путь), принимаемые при ротации
+    # и смене алгоритма: алгоритм проверки определяется типом ключа
+    jwt_verification_keys: dict[str, Path] = {}
+    jwt_token_cache_size: int = 10000  # проверенные токены в памяти, 0 - без кэша
+    principal_cache_ttl: int = 60  # секунды хранения пользователя в Redis
+
+    # Ограничение попыток входа (token bucket в Redis)
+    login_throttle_username_capacity: int = 5
+    login_throttle_username_per_minute: float = 5
+    login_throttle_ip_capacity: int = 30
+    login_throttle_ip_per_minute: float = 30
+    # Адреса или подсети обратных прокси, которым доверяется X-Forwarded-For.
+    # Пусто - IP клиента берётся из соединения, и за прокси все клиенты
+    # попадают в один bucket по IP
+    trusted_proxies: list[str] = []
+
+    # Негативный кэш несуществующих логинов
+    unknown_username_cache_ttl: int = 60  # секунды
+    # Минимальное время ответа аутентификации, должно превышать время bcrypt,
+    # чтобы по времени нельзя было отличить несуществующий логин
+    login_min_response_ms: int = 400
+
+    # Фильтр Блума занятых логинов и email
+    user_identity_filter_capacity: int = 1000000
+    user_identity_filter_error_rate: float = 0.01
+    user_identity_filter_rebuild_interval: int = 600  # секунды, пересборка убирает удалённых
+    # Ограничение /auth/available/ против перебора существующих логинов
+    availability_throttle_value_capacity: int = 10
+    availability_throttle_value_per_minute: float = 10
+    availability_throttle_ip_capacity: int = 30
+    availability_throttle_ip_per_minute: float = 30
+
+    # Отзыв refresh токенов: фильтр Блума в памяти, синхронизируемый из Redis
+    refresh_revocation_sync_interval: int = 30  # секунды
+    refresh_revocation_filter_capacity: int = 100000
+    refresh_revocation_filter_error_rate: float = 0.001
+    # Повтор погашенного токена в эти секунды - параллельное обновление, а не кража
+    refresh_token_reuse_grace_seconds: int = 30
     access_token_expire_minutes: int = 10 # минуты
     refresh_token_expire_days: int = 30 # дни
+
+    # Пул хэширования паролей (bcrypt)
+    password_hash_executor: str = "thread"  # thread | process
+    password_hash_workers: int = 4
+    password_hash_max_concurrency: int = 4  # одновременно выполняемые операции
+    password_hash_max_waiting: int = 64  # длина очереди ожидания, сверх неё отказ
+    password_hash_queue_timeout: float = 2.0  # секунды, 0 - отказ без ожидания
@@ -9,6 +9,7 @@ class BaseConfig(BaseSettings):
     env: str = "development"
     app_host: str
     app_port: int
+    web_concurrency: int = 1  # количество воркеров uvicorn/gunicorn
 
     class Config:
         env_file = ENV_FILE_PATH
@@ -9,10 +9,57 @@ class DatabaseConfig(BaseSettings):
     postgres_password: str
     postgres_db: str
 
+    # Пул соединений (на один воркер)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # секунды ожидания свободного соединения
+    db_pool_recycle: int = 1800  # секунды жизни соединения
+    db_pool_pre_ping: bool = True
+    # Кэш подготовленных выражений asyncpg, 0 при PgBouncer в режиме transaction
+    db_statement_cache_size: int = 100
+    db_server_settings: dict[str, str] = {"application_name": "connectnest"}
+
+    # Статистика SQL по HTTP запросам
+    sql_instrumentation_enabled: bool = True
+    # В development предупреждение, если один запрос повторяется больше N раз
+    sql_repeat_warning_threshold: int = 10
+
+    # Журнал медленных запросов (logs/slow_queries.log)
+    sql_slow_query_threshold_ms: int = 200
+    # Доля медленных SELECT, для которых на отдельном соединении снимается
+    # EXPLAIN (ANALYZE, BUFFERS); запрос при этом выполняется повторно
+    sql_explain_sample_rate: float = 0.01
+
+    # Реплики для чтения: "host" или "host:port", учётные данные как у primary
+    postgres_replica_hosts: list[str] = []
+    db_replica_strategy: str = "round_robin"  # round_robin | least_connections
+
+    def get_engine_options(self, echo: bool = False) -> dict:
+        return {
+            "echo": echo,
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+            "connect_args": {
+                "statement_cache_size": self.db_statement_cache_size,
+                "server_settings": self.db_server_settings,
+            },
+        }
+
     def get_database_string(self):
         database_string = f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         return database_string
 
+    def get_replica_database_strings(self) -> list[str]:
+        database_strings = []
+        for replica in self.postgres_replica_hosts:
+            host, _, port = replica.partition(":")
+            database_strings.append(
+                f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{host}:{port or self.postgres_port}/{self.postgres_db}")
+        return database_strings
+
     class Config:
         env_file = ENV_FILE_PATH
         env_file_encoding = 'utf-8'
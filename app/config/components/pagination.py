@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings
+from app.config.constants import ENV_FILE_PATH
+
+
+class PaginationConfig(BaseSettings):
+    # Ключ HMAC подписи курсоров keyset пагинации, общий для всех воркеров.
+    # Не задан - выводится из приватного ключа JWT
+    pagination_cursor_secret: Optional[str] = None
+
+    @field_validator("pagination_cursor_secret")
+    @classmethod
+    def validate_cursor_secret(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and len(value) < 32:
+            raise ValueError(
+                "PAGINATION_CURSOR_SECRET должен быть не короче 32 символов "
+                "или не задан, тогда он выводится из ключа JWT")
+        return value
+
+    class Config:
+        env_file = ENV_FILE_PATH
+        env_file_encoding = 'utf-8'
@@ -9,6 +9,16 @@ class RedisConfig(BaseSettings):
     redis_password: str = ''
     redis_username: str = ''
 
+    # Общий пул соединений процесса
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5  # секунды ожидания свободного соединения
+    redis_socket_timeout: float = 5
+    redis_socket_connect_timeout: float = 5
+    redis_health_check_interval: int = 30
+    redis_retry_attempts: int = 3
+    redis_retry_backoff_base: float = 0.05  # секунды
+    redis_retry_backoff_cap: float = 1.0
+
     def get_redis_url(self) -> str:
         if self.redis_password:
             return f"redis://{self.redis_username}:{self.redis_password}@{self.redis_host}:{self.redis_port}/{self.redis_db}"
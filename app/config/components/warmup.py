@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings
+from app.config.constants import ENV_FILE_PATH
+
+
+class WarmupConfig(BaseSettings):
+    # Прогрев воркера при старте, до готовности принимать трафик
+    warmup_db_connections: int = 2  # на пул primary и каждой реплики
+    warmup_redis_connections: int = 2
+    warmup_community_pages: int = 0  # первые N страниц списка сообществ в кэш
+    warmup_community_page_size: int = 10
+
+    class Config:
+        env_file = ENV_FILE_PATH
+        env_file_encoding = 'utf-8'
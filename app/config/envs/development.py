@@ -2,6 +2,8 @@ from pydantic_settings import BaseSettings
 
 class DevelopmentConfig(BaseSettings):
     env: str = 'development'
+    # Логирование всех SQL запросов
+    db_echo: bool = True
     # CORS settings
     cors_origins: list[str] = ["*"]
     cors_allow_credentials: bool = True
@@ -2,6 +2,8 @@ from pydantic_settings import BaseSettings
 
 class ProductionConfig(BaseSettings):
     env: str = 'production'
+    # Логирование всех SQL запросов
+    db_echo: bool = False
     # CORS settings
     cors_origins: list[str] = ["https://example.com"]
     cors_allow_credentials: bool = True
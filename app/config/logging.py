@@ -110,8 +110,30 @@ class LoggerConfig:
         logger.addHandler(console_handler)
         logger.addHandler(file_handler)
 
+        LoggerConfig.setup_slow_query_logger(logs_path, date_format)
+
         return logger
 
+    @staticmethod
+    def setup_slow_query_logger(logs_path: Path, date_format: str):
+        """Отдельный журнал медленных SQL запросов, пишется при любом уровне логирования"""
+        slow_logger = logging.getLogger("sql.slow")
+        slow_logger.handlers.clear()
+        slow_logger.propagate = False
+        slow_logger.setLevel(logging.WARNING)
+
+        slow_handler = RotatingFileHandler(
+            logs_path / 'slow_queries.log',
+            maxBytes=10*1024*1024,  # 10 MB
+            backupCount=5
+        )
+        slow_handler.setFormatter(logging.Formatter(
+            fmt='%(asctime)s - %(message)s',
+            datefmt=date_format
+        ))
+        slow_logger.addHandler(slow_handler)
+        return slow_logger
+
 
 class ExtendedConfigLogger:
     @classmethod
@@ -0,0 +1,153 @@
+import hashlib
+import math
+from typing import AsyncIterable, Optional
+
+from redis.asyncio import Redis
+
+
+class BloomHashing:
+    """Размер фильтра Блума, число хэш-функций и номера битов элемента"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        """
+        :param capacity: Ожидаемое количество элементов
+        :param error_rate: Допустимая доля ложноположительных ответов
+        """
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+
+    def positions(self, item: str) -> list[int]:
+        """Номера битов элемента (двойное хэширование)"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+
+class BloomFilter(BloomHashing):
+    """
+    Фильтр Блума.
+
+    Отвечает "точно нет" или "возможно есть" без хранения самих элементов.
+    Ложноположительные ответы возможны с вероятностью error_rate при
+    заполнении до capacity, ложноотрицательных нет.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        super().__init__(capacity, error_rate)
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, item: str) -> None:
+        for position in self.positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(item)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+
+# Биты ставятся в фильтр, если он построен, и в собираемую копию, если
+# идёт пересборка, иначе добавление между выборкой из БД и заменой
+# фильтра потерялось бы
+REDIS_BLOOM_ADD_SCRIPT = """
+local built = redis.call('EXISTS', KEYS[1]) == 1
+local building = redis.call('EXISTS', KEYS[2]) == 1
+for i = 1, #ARGV do
+    if built then
+        redis.call('SETBIT', KEYS[1], ARGV[i], 1)
+    end
+    if building then
+        redis.call('SETBIT', KEYS[2], ARGV[i], 1)
+    end
+end
+return 1
+"""
+
+
+class RedisBloomFilter(BloomHashing):
+    """
+    Фильтр Блума в строке Redis, общий для всех воркеров.
+
+    Биты читаются и ставятся через GETBIT/SETBIT, поэтому добавление
+    в одном воркере сразу видно остальным. Пока фильтр не построен,
+    contains возвращает None. В ключ входят размер и число хэш-функций:
+    смена capacity или error_rate не смешивает разные раскладки битов.
+    """
+
+    def __init__(self, redis_client: Redis, namespace: str, capacity: int, error_rate: float = 0.01) -> None:
+        """
+        :param namespace: Префикс ключей фильтра в Redis
+        """
+        super().__init__(capacity, error_rate)
+        self.redis_client = redis_client
+        self.key = f"{namespace}:{self.size}:{self.hash_count}"
+        self._add_script = redis_client.register_script(REDIS_BLOOM_ADD_SCRIPT)
+
+    @property
+    def _building_key(self) -> str:
+        return f"{self.key}:building"
+
+    @property
+    def _scratch_key(self) -> str:
+        return f"{self.key}:scratch"
+
+    async def add(self, *items: str) -> None:
+        positions = [position for item in items for position in self.positions(item)]
+        await self._add_script(keys=[self.key, self._building_key], args=positions)
+
+    async def contains(self, item: str) -> Optional[bool]:
+        """
+        :return: False - точно нет, True - возможно есть, None - фильтр не построен
+        """
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.exists(self.key)
+            for position in self.positions(item):
+                pipe.getbit(self.key, position)
+            built, *bits = await pipe.execute()
+        if not built:
+            return None
+        return all(bits)
+
+    async def rebuild(self, items: AsyncIterable[str], timeout: int) -> int:
+        """
+        Сборка фильтра заново и атомарная замена текущего
+
+        Собираемая копия создаётся до чтения элементов, поэтому add,
+        выполненные во время сборки, попадают и в неё.
+
+        :param items: Все элементы фильтра
+        :param timeout: Время жизни незавершённой копии, если сборка прервётся
+        :return: Количество элементов
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._building_key)
+            pipe.setbit(self._building_key, self.size - 1, 0)
+            pipe.expire(self._building_key, timeout)
+            await pipe.execute()
+
+        # Порядок битов как у SETBIT: старший бит байта - меньший номер
+        bits = bytearray((self.size + 7) // 8)
+        count = 0
+        async for item in items:
+            for position in self.positions(item):
+                bits[position >> 3] |= 0x80 >> (position & 7)
+            count += 1
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(self._scratch_key, bytes(bits), ex=timeout)
+            pipe.bitop("OR", self._building_key, self._building_key, self._scratch_key)
+            pipe.delete(self._scratch_key)
+            pipe.rename(self._building_key, self.key)
+            pipe.persist(self.key)
+            await pipe.execute()
+        return count
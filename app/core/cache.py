@@ -0,0 +1,249 @@
+import asyncio
+import math
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+
+from app.core.metrics import metrics
+from app.utils.mixins import LoggerMixin
+
+
+# Снятие блокировки только владельцем: она могла истечь и достаться другому воркеру
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class VersionedCache(LoggerMixin):
+    """
+    Кэш в Redis с пространством имён и счётчиком поколений.
+
+    Ключ записи содержит текущее поколение пространства имён. Запись
+    (INCR счётчика) делает все прежние ключи недостижимыми за O(1), без
+    KEYS; устаревшие записи удаляет сам Redis по TTL. Ключ нужно получать
+    до загрузки данных из БД: если поколение сменилось во время загрузки,
+    результат уйдёт под старый ключ и не перекроет свежие данные.
+
+    get_or_load защищает от лавины запросов к БД при истечении записи:
+    загрузка одного ключа выполняется одной задачей в процессе и под
+    блокировкой SET NX между воркерами, устаревшая запись отдаётся, пока
+    она обновляется в фоне, а обновление может начаться раньше срока
+    с вероятностью, растущей к моменту истечения (XFetch).
+    """
+    _prefix = "cache"
+
+    # Загрузки в процессе, общие для всех экземпляров (сервисы создаются на запрос)
+    _inflight: dict[str, asyncio.Task] = {}
+    _background: set[asyncio.Task] = set()
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        namespace: str,
+        ttl: int,
+        stale_ttl: int = 0,
+        beta: float = 1.0,
+        lock_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        """
+        :param namespace: Пространство имён, например community_all
+        :param ttl: Время свежести записей в секундах
+        :param stale_ttl: Сколько секунд после ttl запись ещё отдаётся, пока обновляется в фоне
+        :param beta: Агрессивность раннего обновления, 0 - отключено
+        :param lock_timeout: Время жизни блокировки загрузки между воркерами
+        :param poll_interval: Интервал ожидания результата чужой загрузки
+        """
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self._prefix}:{self.namespace}:generation"
+
+    async def generation(self) -> int:
+        """Текущее поколение пространства имён"""
+        value = await self.redis_client.get(self._generation_key)
+        return int(value) if value is not None else 0
+
+    async def key(self, *parts: Any) -> str:
+        """Ключ записи в текущем поколении"""
+        generation = await self.generation()
+        suffix = ":".join(str(part) for part in parts)
+        return f"{self._prefix}:{self.namespace}:v{generation}:{suffix}"
+
+    @staticmethod
+    def _unpack(raw: Optional[str]) -> Optional[tuple[str, float, float]]:
+        """Формат записи: <истечение свежести>:<время загрузки>:<значение>"""
+        if raw is None:
+            return None
+        try:
+            expires_at, delta, value = raw.split(":", 2)
+            return value, float(expires_at), float(delta)
+        except ValueError:
+            return None
+
+    def _track(self, name: str) -> None:
+        metrics.increment(f"cache_{self.namespace}_{name}")
+
+    async def get(self, key: str) -> Optional[str]:
+        """Значение записи, в том числе устаревшей"""
+        entry = self._unpack(await self.redis_client.get(key))
+        self._track("hit" if entry is not None else "miss")
+        return entry[0] if entry is not None else None
+
+    async def set(self, key: str, value: str, delta: float = 0.0) -> None:
+        """
+        :param delta: Время загрузки значения в секундах, для раннего обновления
+        """
+        packed = f"{time.time() + self.ttl:.3f}:{delta:.4f}:{value}"
+        await self.redis_client.set(key, packed, ex=self.ttl + self.stale_ttl)
+
+    def _refresh_early(self, expires_at: float, delta: float, now: float) -> bool:
+        """XFetch: вероятность обновления растёт к истечению и с ростом времени загрузки"""
+        if self.beta <= 0:
+            return False
+        return now - delta * self.beta * math.log(1.0 - random.random()) >= expires_at
+
+    async def _wait_for_peer(self, key: str) -> Optional[str]:
+        """Ожидание значения, которое загружает другой воркер"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            entry = self._unpack(await self.redis_client.get(key))
+            if entry is not None:
+                return entry[0]
+        return None
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[str]], wait_for_peer: bool) -> Optional[str]:
+        """
+        Загрузка под блокировкой между воркерами
+
+        :param wait_for_peer: Если блокировка занята - ждать чужой результат,
+            иначе вернуть None (фоновое обновление уже идёт в другом воркере)
+        """
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        acquired = await self.redis_client.set(
+            lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+        if not acquired:
+            if not wait_for_peer:
+                return None
+            value = await self._wait_for_peer(key)
+            if value is not None:
+                return value
+            self.logger.warning("Не дождались загрузки кэша другим воркером",
+                                extra={"namespace": self.namespace})
+
+        try:
+            started = time.perf_counter()
+            value = await loader()
+            await self.set(key, value, delta=time.perf_counter() - started)
+            self._track("load")
+            return value
+        finally:
+            if acquired:
+                await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    def _single_flight(self, key: str, loader: Callable[[], Awaitable[str]], wait_for_peer: bool) -> asyncio.Task:
+        """Одна задача загрузки ключа на процесс"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader, wait_for_peer))
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Task) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(_forget)
+        return task
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[str]]) -> None:
+        task = self._single_flight(key, loader, wait_for_peer=False)
+        if task in self._background:
+            return
+        self._background.add(task)
+
+        def _done(done: asyncio.Task) -> None:
+            self._background.discard(done)
+            if not done.cancelled() and done.exception() is not None:
+                self.logger.error("Ошибка фонового обновления кэша",
+                                  extra={"namespace": self.namespace, "error": str(done.exception())})
+
+        task.add_done_callback(_done)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[str]]) -> str:
+        """
+        Значение из кэша либо из loader с защитой от лавины загрузок
+
+        loader выполняется в отдельной задаче и может пережить запрос,
+        поэтому он должен сам открывать сессию БД, а не использовать сессию запроса.
+
+        :param key: Ключ из key()
+        :param loader: Корутинная функция, возвращающая сериализованное значение
+        """
+        entry = self._unpack(await self.redis_client.get(key))
+        if entry is not None:
+            value, expires_at, delta = entry
+            now = time.time()
+            if now >= expires_at:
+                self._track("stale")
+            elif self._refresh_early(expires_at, delta, now):
+                self._track("early")
+            else:
+                self._track("hit")
+                return value
+            self._refresh_in_background(key, loader)
+            return value
+
+        self._track("miss")
+        value = await asyncio.shield(self._single_flight(key, loader, wait_for_peer=True))
+        if value is None:
+            # Присоединились к фоновому обновлению, которое уступило другому воркеру
+            value = await self._load(key, loader, wait_for_peer=True)
+        return value
+
+    async def invalidate(self) -> int:
+        """
+        Смена поколения: все записи пространства имён становятся устаревшими
+
+        :return: Новое поколение
+        """
+        generation = await self.redis_client.incr(self._generation_key)
+        self.logger.info("Поколение кэша увеличено",
+                         extra={"namespace": self.namespace, "generation": generation})
+        return generation
+
+    async def purge(self, batch_size: int = 500) -> int:
+        """
+        Явное удаление всех записей пространства имён через SCAN и UNLINK
+
+        Не блокирует Redis: ключи перебираются порциями, память освобождается
+        в фоне. Счётчик поколений сохраняется.
+
+        :return: Количество удалённых ключей
+        """
+        removed = 0
+        batch: list[str] = []
+        async for key in self.redis_client.scan_iter(
+                match=f"{self._prefix}:{self.namespace}:v*", count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                removed += await self.redis_client.unlink(*batch)
+                batch.clear()
+        if batch:
+            removed += await self.redis_client.unlink(*batch)
+        self.logger.info("Кэш очищен", extra={"namespace": self.namespace, "removed": removed})
+        return removed
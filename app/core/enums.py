@@ -10,3 +10,11 @@ class MediaType(Enum):
 class LogLevel(Enum):
     DEV = "developer"
     PROD = "production"
+
+
+class PaginationStrategy(Enum):
+    SEPARATE_COUNT = "separate_count"  # отдельный COUNT и выборка страницы
+    WINDOW = "window"  # страница и count(*) OVER () одним запросом
+    ESTIMATE = "estimate"  # оценка по статистике планировщика
+    CACHED = "cached"  # точное количество из Redis
+    NO_TOTAL = "no_total"  # без общего количества, только has_next
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.api.auth.availability import get_user_identity_filter
+from app.api.auth.refresh_store import revocation_filter
+from app.api.auth.security import get_password_hasher
+from app.api.auth.utils_jwt import get_jwt_manager, init_jwt_manager
+from app.config import settings
+from app.db.session import async_session, close_db_engines, close_redis_pool, create_redis_client, init_redis_pool, log_pool_configuration
+from app.core.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+
+def _reload_jwt_keys() -> None:
+    try:
+        get_jwt_manager().reload_keys()
+    except Exception:
+        # Ошибка уже залогирована, продолжаем работать со старыми ключами
+        pass
+
+
+def _register_reload_signal() -> None:
+    """Перезагрузка ключей JWT по SIGHUP без остановки воркера"""
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _reload_jwt_keys)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        logger.warning("Перезагрузка ключей JWT по сигналу недоступна")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения: запуск и корректная остановка ресурсов.
+
+    Воркер сообщает о готовности (app.state.ready) только после прогрева.
+    """
+    app.state.ready = False
+    log_pool_configuration()
+    init_jwt_manager()
+    _register_reload_signal()
+
+    init_redis_pool()
+    redis_client = create_redis_client()
+    background_tasks = [
+        asyncio.create_task(revocation_filter.run_sync(
+            redis_client, settings.refresh_revocation_sync_interval)),
+        asyncio.create_task(get_user_identity_filter(redis_client).run_rebuild(
+            async_session, settings.user_identity_filter_rebuild_interval)),
+    ]
+
+    await warm_up()
+    app.state.ready = True
+
+    yield
+
+    app.state.ready = False
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_redis_pool()
+    await close_db_engines()
+    get_password_hasher().shutdown()
@@ -0,0 +1,28 @@
+from collections import defaultdict
+from typing import Any, Callable
+
+
+class MetricsRegistry:
+    """Простой реестр счётчиков и датчиков процесса"""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, int] = defaultdict(int)
+        self._gauges: dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Увеличение счётчика"""
+        self._counters[name] += value
+
+    def register_gauge(self, name: str, func: Callable[[], Any]) -> None:
+        """Регистрация датчика, значение вычисляется при снятии метрик"""
+        self._gauges[name] = func
+
+    def snapshot(self) -> dict[str, Any]:
+        """Текущие значения всех счётчиков и датчиков"""
+        result: dict[str, Any] = dict(self._counters)
+        for name, func in self._gauges.items():
+            result[name] = func()
+        return result
+
+
+metrics = MetricsRegistry()
@@ -7,21 +7,58 @@ from typing import Generic, TypeVar, Optional, Any, Tuple
 
 from abc import ABC, abstractmethod
 
+import base64
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_, or_, tuple_, inspect, text, Table
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.config import settings
+from app.core.enums import PaginationStrategy
+from app.exceptions import InvalidCursorException
 
 T = TypeVar("T")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: Optional[int] = None  # None в режиме без общего количества
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    has_next: bool = False
     next_page: Optional[int] = None
     prev_page: Optional[int] = None
 
+    @classmethod
+    def build(cls, items: list[Any], page: int, size: int, total: Optional[int] = None, has_next: Optional[bool] = None):
+        """
+        Ответ страницы по результату Paginator
+
+        :param total: Общее количество, точное или оценка; None если не считалось
+        :param has_next: Наличие следующей страницы, если известно из выборки limit+1
+        """
+        pages = (total + size - 1) // size if total is not None else None
+        if has_next is None:
+            has_next = pages is not None and page < pages
+        return cls(
+            items=items,
+            total=total,
+            page=page,
+            size=size,
+            pages=pages,
+            has_next=has_next,
+            next_page=page+1 if has_next else None,
+            prev_page=page-1 if page > 1 else None
+        )
+
 
 class PaginationParams(BaseModel):
     page: int = 1
@@ -36,6 +73,36 @@ class PaginationParams(BaseModel):
         return self.size
 
 
+def project_query(model, schema: type[BaseModel], query=None, extra_columns=()):
+    """
+    select только колонок модели, которые есть в схеме ответа
+
+    Строки такого запроса не попадают в identity map и не загружают
+    лишние колонки (например, длинные Text).
+
+    :param schema: Pydantic схема ответа, поля которой совпадают с атрибутами модели
+    :param extra_columns: Колонки, нужные помимо схемы (ключи курсора)
+    """
+    query = select(model) if query is None else query
+    column_attrs = inspect(model).column_attrs
+    columns = []
+    for name in schema.model_fields:
+        if name not in column_attrs:
+            raise ValueError(f"У модели {model.__name__} нет колонки {name}")
+        columns.append(getattr(model, name))
+    for column in extra_columns:
+        if not any(column is existing or column.key == existing.key for existing in columns):
+            columns.append(column)
+    return query.with_only_columns(*columns)
+
+
+def _rows(result, as_mappings: bool) -> list[Any]:
+    """ORM объекты либо лёгкие словари строк для проекции"""
+    if as_mappings:
+        return result.mappings().all()
+    return result.scalars().all()
+
+
 class CountService(ABC):
 
     @abstractmethod
@@ -44,6 +111,8 @@ class CountService(ABC):
 
 
 class FetchService(ABC):
+    # Известно только стратегиям, выбирающим limit+1 строк
+    has_next: Optional[bool] = None
 
     @abstractmethod
     def fetch(self, session: AsyncSession) -> list[Any]:
@@ -61,15 +130,168 @@ class SQLAlchemyCountService(CountService):
 
 
 class SQLAlchemyFetchService(FetchService):
-    def __init__(self, query, limit: int, offset: int):
+    def __init__(self, query, limit: int, offset: int, detect_next: bool = False, as_mappings: bool = False):
+        """
+        :param detect_next: Выбрать limit+1 строк, чтобы знать о следующей странице без COUNT
+        :param as_mappings: Вернуть словари строк вместо ORM объектов (для проекции)
+        """
+        self.query = query
+        self.limit = limit
+        self.offset = offset
+        self.detect_next = detect_next
+        self.as_mappings = as_mappings
+
+    async def fetch(self, session: AsyncSession):
+        limit = self.limit + 1 if self.detect_next else self.limit
+        paginate_query = self.query.limit(limit).offset(self.offset)
+        result = await session.execute(paginate_query)
+        items = _rows(result, self.as_mappings)
+        if self.detect_next:
+            self.has_next = len(items) > self.limit
+            items = items[:self.limit]
+        return items
+
+
+class EstimatedCountService(CountService):
+    """
+    Оценка количества без полного прохода по таблице.
+
+    Для выборки из одной таблицы без условий берётся pg_class.reltuples,
+    для остальных запросов - оценка строк из EXPLAIN. Точность зависит
+    от свежести статистики (ANALYZE/autovacuum).
+    """
+
+    def __init__(self, query):
+        self.query = query.order_by(None)
+
+    def _plain_table(self) -> Optional[Table]:
+        froms = self.query.get_final_froms()
+        if (self.query.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table)
+                and not self.query._group_by_clauses and not self.query._distinct):
+            return froms[0]
+        return None
+
+    async def _reltuples(self, session: AsyncSession, table: Table) -> Optional[int]:
+        result = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": table.fullname}
+        )
+        reltuples = result.scalar()
+        # -1: таблица ещё ни разу не анализировалась
+        return reltuples if reltuples is not None and reltuples >= 0 else None
+
+    async def _explain_rows(self, session: AsyncSession) -> int:
+        connection = await session.connection()
+        compiled = self.query.compile(dialect=connection.dialect)
+        params = compiled.construct_params()
+        if compiled.positiontup is not None:
+            params = tuple(params[name] for name in compiled.positiontup)
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def count(self, session: AsyncSession) -> int:
+        table = self._plain_table()
+        if table is None:
+            return await self._explain_rows(session)
+        estimate = await self._reltuples(session, table)
+        if estimate is None:
+            return await SQLAlchemyCountService(self.query).count(session)
+        return estimate
+
+
+# Изменение счётчика только если он уже закэширован: иначе INCRBY создал бы
+# ключ с неверным значением
+ADJUST_COUNT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+class CachedCountService(CountService):
+    """
+    Точное количество, закэшированное в Redis.
+
+    Кэш заполняется COUNT запросом при промахе, а при вставке и удалении
+    корректируется через adjust_cached_count. Изменения, прошедшие мимо
+    adjust_cached_count (удаления без корректировки, каскады, правки в БД
+    напрямую), оставляют счётчик неточным до истечения TTL, после которого
+    он пересчитывается.
+    """
+
+    def __init__(self, query, redis_client, key: str, ttl: int = 3600):
+        self.query = query
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl = ttl
+
+    async def count(self, session: AsyncSession) -> int:
+        cached = await self.redis_client.get(self.key)
+        if cached is not None:
+            return int(cached)
+        total = await SQLAlchemyCountService(self.query).count(session)
+        await self.redis_client.set(self.key, total, ex=self.ttl, nx=True)
+        return total
+
+
+async def adjust_cached_count(redis_client, key: str, delta: int) -> None:
+    """Корректировка закэшированного количества после вставки (+1) или удаления (-1)"""
+    await redis_client.eval(ADJUST_COUNT_SCRIPT, 1, key, delta)
+
+
+class NoTotalCountService(CountService):
+    """Режим без общего количества: о следующей странице говорит выборка limit+1"""
+
+    async def count(self, session: AsyncSession) -> None:
+        return None
+
+
+class WindowFetchService(FetchService, CountService):
+    """
+    Страница и общее количество одним запросом через count(*) OVER ().
+
+    Экономит круг до БД и второй проход по данным, но окно всё равно
+    считается по всем строкам, подходящим под WHERE. Служит одновременно
+    FetchService и CountService: count отдаёт итог последнего fetch.
+    """
+    _total_label = "_pagination_total"
+
+    def __init__(self, query, limit: int, offset: int, as_mappings: bool = False):
         self.query = query
         self.limit = limit
         self.offset = offset
+        self.as_mappings = as_mappings
+        self._total: Optional[int] = None
 
     async def fetch(self, session: AsyncSession):
-        paginate_query = self.query.limit(self.limit).offset(self.offset)
+        paginate_query = (
+            self.query
+            .add_columns(func.count().over().label(self._total_label))
+            .limit(self.limit)
+            .offset(self.offset)
+        )
         result = await session.execute(paginate_query)
-        return result.scalars().all()
+        rows = result.all()
+        if rows:
+            self._total = rows[0][-1]
+        elif self.offset == 0:
+            self._total = 0
+        if self.as_mappings:
+            return [
+                {key: value for key, value in row._mapping.items() if key != self._total_label}
+                for row in rows
+            ]
+        return [row[0] for row in rows]
+
+    async def count(self, session: AsyncSession) -> int:
+        if self._total is None:
+            # Страница за пределами выборки: окно не вернуло ни одной строки
+            self._total = await SQLAlchemyCountService(self.query).count(session)
+        return self._total
 
 
 class Paginator:
@@ -78,17 +300,262 @@ class Paginator:
         self.fetch_service = fetch_service
 
     async def execute(self, session: AsyncSession):
-        total = await self.count_service.count(session)
+        # Сначала выборка: стратегии вроде WindowFetchService получают итог вместе со страницей
         items = await self.fetch_service.fetch(session)
+        total = await self.count_service.count(session)
         return items, total
 
+    @property
+    def has_next(self) -> Optional[bool]:
+        return self.fetch_service.has_next
+
 
-def create_paginated_query(model, page: int, size: int, custom_query=None):
+def create_paginated_query(model, page: int, size: int, custom_query=None,
+                           strategy: PaginationStrategy = PaginationStrategy.SEPARATE_COUNT,
+                           redis_client=None, count_cache_key: Optional[str] = None,
+                           count_cache_ttl: int = 3600, schema: Optional[type[BaseModel]] = None):
+    """
+    :param strategy: Компромисс точности и задержки подсчёта общего количества
+    :param redis_client: Клиент Redis для PaginationStrategy.CACHED
+    :param count_cache_key: Ключ закэшированного количества для PaginationStrategy.CACHED
+    :param schema: Схема ответа: выбираются только её колонки, строки возвращаются словарями
+    """
     query = select(model) if custom_query is None else custom_query
+    as_mappings = schema is not None
+    if as_mappings:
+        query = project_query(model, schema, query)
     offset = (page-1)*size
     limit = size
 
-    count_service = SQLAlchemyCountService(query)
-    fetch_service = SQLAlchemyFetchService(query, limit=limit, offset=offset)
+    if strategy is PaginationStrategy.WINDOW:
+        window_service = WindowFetchService(
+            query, limit=limit, offset=offset, as_mappings=as_mappings)
+        return Paginator(window_service, window_service)
+
+    if strategy is PaginationStrategy.SEPARATE_COUNT:
+        count_service = SQLAlchemyCountService(query)
+        fetch_service = SQLAlchemyFetchService(
+            query, limit=limit, offset=offset, as_mappings=as_mappings)
+        return Paginator(count_service, fetch_service)
+
+    if strategy is PaginationStrategy.ESTIMATE:
+        count_service = EstimatedCountService(query)
+    elif strategy is PaginationStrategy.CACHED:
+        if redis_client is None or count_cache_key is None:
+            raise ValueError("Для CACHED нужны redis_client и count_cache_key")
+        count_service = CachedCountService(
+            query, redis_client, count_cache_key, ttl=count_cache_ttl)
+    else:
+        count_service = NoTotalCountService()
+    fetch_service = SQLAlchemyFetchService(
+        query, limit=limit, offset=offset, detect_next=True, as_mappings=as_mappings)
 
     return Paginator(count_service, fetch_service)
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    items: list[T]
+    size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class CursorParams(BaseModel):
+    cursor: Optional[str] = None
+    size: int = 10
+
+
+CURSOR_SECRET_PURPOSE = "pagination-cursor"
+
+
+def get_cursor_secret() -> str | bytes:
+    """
+    Ключ подписи курсоров: PAGINATION_CURSOR_SECRET, а если он не задан -
+    производный от ключа подписи JWT. При ротации ключа JWT выданные
+    курсоры перестают приниматься.
+    """
+    if settings.pagination_cursor_secret:
+        return settings.pagination_cursor_secret
+    from app.api.auth.utils_jwt import get_jwt_manager
+
+    return get_jwt_manager().derive_secret(CURSOR_SECRET_PURPOSE)
+
+
+class CursorCodec:
+    """
+    Непрозрачный курсор: значения ключей сортировки последней строки,
+    направление перехода и имена ключей, подписанные HMAC-SHA256.
+    """
+
+    def __init__(self, secret: str | bytes):
+        self._secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, datetime):
+            return {"t": "dt", "v": value.isoformat()}
+        if isinstance(value, date):
+            return {"t": "d", "v": value.isoformat()}
+        if isinstance(value, uuid.UUID):
+            return {"t": "uuid", "v": str(value)}
+        if isinstance(value, Decimal):
+            return {"t": "dec", "v": str(value)}
+        return value
+
+    @staticmethod
+    def _load_value(value):
+        if not isinstance(value, dict):
+            return value
+        loaders = {
+            "dt": datetime.fromisoformat,
+            "d": date.fromisoformat,
+            "uuid": uuid.UUID,
+            "dec": Decimal,
+        }
+        return loaders[value["t"]](value["v"])
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def encode(self, keys: list[str], values: list[Any], direction: str) -> str:
+        payload = json.dumps(
+            {"k": keys, "v": [self._dump_value(v) for v in values], "d": direction},
+            separators=(",", ":")
+        ).encode("utf-8")
+        return "{}.{}".format(
+            base64.urlsafe_b64encode(payload).decode().rstrip("="),
+            base64.urlsafe_b64encode(self._sign(payload)).decode().rstrip("="),
+        )
+
+    def decode(self, cursor: str, keys: list[str]) -> Tuple[list[Any], str]:
+        """
+        :return: Значения ключей и направление (next или prev)
+        :raises InvalidCursorException: Подпись не совпала или курсор от другой сортировки
+        """
+        try:
+            raw_payload, raw_signature = cursor.split(".")
+            payload = base64.urlsafe_b64decode(raw_payload + "=" * (-len(raw_payload) % 4))
+            signature = base64.urlsafe_b64decode(raw_signature + "=" * (-len(raw_signature) % 4))
+        except ValueError:
+            raise InvalidCursorException("Некорректный курсор")
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidCursorException("Некорректный курсор")
+
+        data = json.loads(payload)
+        if data["k"] != keys or data["d"] not in ("next", "prev"):
+            raise InvalidCursorException("Курсор не подходит для этого запроса")
+        return [self._load_value(v) for v in data["v"]], data["d"]
+
+
+class KeysetPaginator:
+    """
+    Пагинация по курсору (keyset): вместо OFFSET условие по ключам сортировки
+    последней строки, поэтому стоимость страницы не зависит от её глубины.
+
+    Ключи берутся из ORDER BY запроса, первичный ключ модели добавляется
+    для однозначного порядка. Ключи должны быть NOT NULL.
+    """
+
+    def __init__(self, model, query, size: int, cursor: Optional[str] = None, codec: Optional[CursorCodec] = None,
+                 schema: Optional[type[BaseModel]] = None):
+        """
+        :param schema: Схема ответа: выбираются её колонки и ключи курсора, строки - словари
+        """
+        self.model = model
+        self.query = query
+        self.size = size
+        self.cursor = cursor
+        self.codec = codec or CursorCodec(get_cursor_secret())
+        self.sort_keys = self._get_sort_keys()
+        self.as_mappings = schema is not None
+        if self.as_mappings:
+            self.query = project_query(
+                model, schema, query, extra_columns=[column for column, _, _ in self.sort_keys])
+
+    def _get_sort_keys(self) -> list[Tuple[Any, bool, str]]:
+        """Ключи сортировки: (колонка, по убыванию, имя атрибута модели)"""
+        mapper = inspect(self.model)
+        keys = []
+        for clause in self.query._order_by_clauses:
+            descending = False
+            if isinstance(clause, UnaryExpression):
+                if clause.modifier not in (operators.desc_op, operators.asc_op):
+                    raise ValueError("Keyset пагинация не поддерживает NULLS FIRST/LAST")
+                descending = clause.modifier is operators.desc_op
+                clause = clause.element
+            keys.append((clause, descending, mapper.get_property_by_column(clause).key))
+
+        used = {name for _, _, name in keys}
+        tiebreak_desc = keys[-1][1] if keys else False
+        for column in mapper.primary_key:
+            name = mapper.get_property_by_column(column).key
+            if name not in used:
+                keys.append((getattr(self.model, name), tiebreak_desc, name))
+        return keys
+
+    def _after(self, values: list[Any], backward: bool):
+        """Условие "строго после курсора" с учётом направления перехода"""
+        directions = {descending != backward for _, descending, _ in self.sort_keys}
+        columns = [column for column, _, _ in self.sort_keys]
+        if len(directions) == 1:
+            # Одинаковое направление: сравнение кортежей, использует составной индекс
+            if directions.pop():
+                return tuple_(*columns) < tuple_(*values)
+            return tuple_(*columns) > tuple_(*values)
+
+        conditions = []
+        for i, (column, descending, _) in enumerate(self.sort_keys):
+            compare = column < values[i] if descending != backward else column > values[i]
+            equal = [columns[j] == values[j] for j in range(i)]
+            conditions.append(and_(*equal, compare))
+        return or_(*conditions)
+
+    def _order_by(self, backward: bool) -> list[Any]:
+        return [
+            column.desc() if descending != backward else column.asc()
+            for column, descending, _ in self.sort_keys
+        ]
+
+    def _encode(self, item, direction: str) -> str:
+        names = [name for _, _, name in self.sort_keys]
+        if self.as_mappings:
+            values = [item[name] for name in names]
+        else:
+            values = [getattr(item, name) for name in names]
+        return self.codec.encode(names, values, direction)
+
+    async def execute(self, session: AsyncSession):
+        """
+        :return: Строки страницы, курсор следующей и предыдущей страницы
+        """
+        names = [name for _, _, name in self.sort_keys]
+        query = self.query.order_by(None)
+        backward = False
+        if self.cursor:
+            values, direction = self.codec.decode(self.cursor, names)
+            backward = direction == "prev"
+            query = query.where(self._after(values, backward))
+
+        # Лишняя строка показывает, есть ли страница дальше
+        query = query.order_by(*self._order_by(backward)).limit(self.size + 1)
+        result = await session.execute(query)
+        items = list(_rows(result, self.as_mappings))
+        has_more = len(items) > self.size
+        items = items[:self.size]
+        if backward:
+            items.reverse()
+
+        if not items:
+            return items, None, None
+
+        has_next = has_more if not backward else True
+        has_prev = has_more if backward else bool(self.cursor)
+        next_cursor = self._encode(items[-1], "next") if has_next else None
+        prev_cursor = self._encode(items[0], "prev") if has_prev else None
+        return items, next_cursor, prev_cursor
+
+
+def create_cursor_paginated_query(model, size: int, cursor: Optional[str] = None, custom_query=None,
+                                  schema: Optional[type[BaseModel]] = None):
+    query = select(model) if custom_query is None else custom_query
+    return KeysetPaginator(model, query, size=size, cursor=cursor, schema=schema)
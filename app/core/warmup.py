@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.db.session import create_redis_client, engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_engine(db_engine: AsyncEngine, count: int) -> None:
+    connections = await asyncio.gather(*(db_engine.connect() for _ in range(count)))
+    try:
+        for connection in connections:
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def warm_up_db(count: int) -> None:
+    """Открытие соединений пулов primary и реплик заранее"""
+    count = min(count, settings.db_pool_size)
+    if count <= 0:
+        return
+    await asyncio.gather(*(
+        _warm_up_engine(db_engine, count) for db_engine in (engine, *replica_engines)))
+
+
+async def warm_up_redis(count: int) -> None:
+    """Открытие соединений пула Redis заранее"""
+    count = min(count, settings.redis_max_connections)
+    if count <= 0:
+        return
+    redis_client = create_redis_client()
+    await asyncio.gather(*(redis_client.ping() for _ in range(count)))
+
+
+async def warm_up_community_cache(pages: int, size: int) -> None:
+    """Заполнение кэша первых страниц списка сообществ"""
+    from app.api.communities.service import ReadCommunotyService
+
+    # Сессия запроса не нужна: страницы загружаются собственными сессиями сервиса
+    service = ReadCommunotyService(None, create_redis_client())
+    for page in range(1, pages + 1):
+        await service.get(page=page, size=size)
+
+
+async def warm_up() -> None:
+    """
+    Прогрев воркера: маперы SQLAlchemy, соединения БД и Redis, кэш.
+
+    Выполняется до готовности, чтобы первые запросы не платили за холодный старт.
+    """
+    started = time.monotonic()
+    configure_mappers()
+    await asyncio.gather(
+        warm_up_db(settings.warmup_db_connections),
+        warm_up_redis(settings.warmup_redis_connections),
+    )
+    await warm_up_community_cache(
+        settings.warmup_community_pages, settings.warmup_community_page_size)
+    logger.info(
+        "Прогрев воркера завершён",
+        extra={"duration": f"{time.monotonic() - started:.3f} sec"}
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("sql.slow")
+
+# Фоновые задачи EXPLAIN, ссылки хранятся до завершения
+_explain_tasks: set[asyncio.Task] = set()
+
+# Опция выполнения, которой помечены собственные EXPLAIN: они не попадают
+# в журнал медленных запросов, иначе дублировали бы анализируемый запрос
+EXPLAIN_EXECUTION_OPTION = "slow_query_explain"
+
+
+class RequestQueryStats:
+    """Статистика SQL одного HTTP запроса"""
+
+    def __init__(self, route: str) -> None:
+        self.route = route
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+        # Параметры передаются отдельно, поэтому текст запроса и есть его форма
+        self.statements[statement] += 1
+        threshold = settings.sql_repeat_warning_threshold
+        if settings.env == "development" and self.statements[statement] == threshold + 1:
+            logger.warning(
+                "Возможная проблема N+1: запрос повторяется в рамках одного HTTP запроса",
+                extra={
+                    "route": self.route,
+                    "threshold": threshold,
+                    "statement": statement[:500]
+                }
+            )
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing"""
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest_time * 1000:.2f}'
+        )
+
+
+request_query_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "request_query_stats", default=None)
+
+
+def redact_parameters(parameters, executemany: bool):
+    """Параметры без значений: только типы"""
+    if executemany:
+        return f"<{len(parameters)} наборов параметров>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if parameters is None:
+        return None
+    return [f"<{type(value).__name__}>" for value in parameters]
+
+
+async def _explain(engine: AsyncEngine, statement: str, parameters, route: str | None) -> None:
+    """EXPLAIN (ANALYZE, BUFFERS) медленного запроса на отдельном соединении"""
+    request_query_stats.set(None)
+    try:
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(**{EXPLAIN_EXECUTION_OPTION: True})
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            plan = "\n".join(row[0] for row in result)
+    except Exception as e:
+        logger.warning("Не удалось получить EXPLAIN медленного запроса",
+                       extra={"error": str(e)})
+        return
+    slow_query_logger.warning(json.dumps(
+        {"event": "explain", "route": route, "statement": statement, "plan": plan},
+        ensure_ascii=False))
+
+
+def _record_slow_query(engine: AsyncEngine, statement: str, parameters, executemany: bool, duration: float) -> None:
+    stats = request_query_stats.get()
+    route = stats.route if stats is not None else None
+    slow_query_logger.warning(json.dumps(
+        {
+            "event": "slow_query",
+            "route": route,
+            "duration_ms": round(duration * 1000, 2),
+            "statement": statement,
+            "parameters": redact_parameters(parameters, executemany),
+        },
+        ensure_ascii=False, default=str))
+
+    is_select = statement.lstrip()[:6].upper() == "SELECT"
+    if executemany or not is_select or random.random() >= settings.sql_explain_sample_rate:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_explain(engine, statement, parameters, route))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключение сбора статистики SQL и журнала медленных запросов к движку"""
+    slow_threshold = settings.sql_slow_query_threshold_ms / 1000
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        if conn.get_execution_options().get(EXPLAIN_EXECUTION_OPTION):
+            return
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration >= slow_threshold:
+            _record_slow_query(engine, statement, parameters, executemany, duration)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
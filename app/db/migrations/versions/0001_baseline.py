@@ -0,0 +1,109 @@
+"""baseline
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'topic',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='id темы'),
+        sa.Column('title', sa.String(length=100), nullable=False, comment='Тема'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('title'),
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='id пользователя'),
+        sa.Column('username', sa.String(length=30), nullable=False, comment='Логин пользователя'),
+        sa.Column('first_name', sa.String(length=30), nullable=True, comment='Имя пользователя'),
+        sa.Column('last_name', sa.String(length=30), nullable=True, comment='Фамилия пользователя'),
+        sa.Column('email', sa.String(length=255), nullable=False, comment='Почта пользователя'),
+        sa.Column('password', sa.String(length=255), nullable=False,
+                  comment='Захешированный пароль пользователя'),
+        sa.Column('is_active', sa.Boolean(), nullable=False, comment='Флаг активности учётной записи'),
+        sa.Column('date_joined', sa.DateTime(), server_default=sa.text('now()'), nullable=False,
+                  comment='Дата регистрации'),
+        sa.Column('last_login', sa.DateTime(), nullable=True, comment='Дата и время последнего входаи'),
+        sa.Column('is_superuser', sa.Boolean(), nullable=False,
+                  comment='Является ли администратором пользователь'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email'),
+    )
+    op.create_table(
+        'communities',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='id сообщества'),
+        sa.Column('title', sa.String(length=160), nullable=False, comment='Заголовок'),
+        sa.Column('description', sa.Text(), nullable=True, comment='Описание сообщества'),
+        sa.Column('date_create', sa.DateTime(), server_default=sa.text('now()'), nullable=False,
+                  comment='Дата создания'),
+        sa.Column('image_logo', sa.String(length=255), nullable=True),
+        sa.Column('admin_id', postgresql.UUID(as_uuid=True), nullable=False,
+                  comment='ID администратора сообщества'),
+        sa.ForeignKeyConstraint(['admin_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'post',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='id поста'),
+        sa.Column('title', sa.String(length=255), nullable=False, comment='Заголовок'),
+        sa.Column('description', sa.Text(), nullable=True, comment='Описание поста'),
+        sa.Column('create_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False,
+                  comment='Дата создания'),
+        sa.Column('update_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False,
+                  comment='Дата обновления'),
+        sa.Column('image', sa.String(length=255), nullable=False),
+        sa.Column('author_id', postgresql.UUID(as_uuid=True), nullable=False, comment='ID автора поста'),
+        sa.Column('communities_id', postgresql.UUID(as_uuid=True), nullable=False,
+                  comment='ID сообщества'),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['communities_id'], ['communities.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'user_community',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('community_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('date_joined', sa.DateTime(), server_default=sa.text('now()'), nullable=False,
+                  comment='Дата вступления в сообщество'),
+        sa.ForeignKeyConstraint(['community_id'], ['communities.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'community_id', name='uix_user_community'),
+    )
+    op.create_table(
+        'topic_post',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, comment='id'),
+        sa.Column('topic_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('post_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['post.id']),
+        sa.ForeignKeyConstraint(['topic_id'], ['topic.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('topic_post')
+    op.drop_table('user_community')
+    op.drop_table('post')
+    op.drop_table('communities')
+    op.drop_table('users')
+    op.drop_table('topic')
@@ -0,0 +1,49 @@
+"""indexes for hot query paths
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_hot_path_indexes'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE INDEX CONCURRENTLY не блокирует запись, но не может выполняться
+# внутри транзакции, поэтому индексы создаются в autocommit_block.
+# Прерванная сборка оставляет невалидный индекс, его нужно удалить
+# и повторить миграцию.
+INDEXES = (
+    # Лента сообществ: ORDER BY date_create DESC, id DESC
+    ('ix_communities_date_create_id', 'communities',
+     [sa.text('date_create DESC'), sa.text('id DESC')]),
+    # Сообщества администратора
+    ('ix_communities_admin_id', 'communities', ['admin_id']),
+    ('ix_post_communities_id', 'post', ['communities_id']),
+    ('ix_post_author_id', 'post', ['author_id']),
+    ('ix_topic_post_topic_id_post_id', 'topic_post', ['topic_id', 'post_id']),
+    # user_id уже покрыт уникальным индексом uix_user_community (user_id, community_id)
+    ('ix_user_community_community_id', 'user_community', ['community_id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,8 +1,9 @@
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, String, DateTime, func, Text, ForeignKey
+from sqlalchemy import Boolean, String, DateTime, func, Text, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from typing import List
@@ -19,7 +20,7 @@ class Communities(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         comment="id сообщества"
     )
     title: Mapped[str] = mapped_column(
@@ -43,6 +44,7 @@ class Communities(Base):
         UUID(as_uuid=True),
         ForeignKey('users.id'),
         nullable=False,
+        index=True,
         comment="ID администратора сообщества"
     )
 
@@ -68,3 +70,11 @@ class Communities(Base):
         'Post',
         back_populates='communities'
     )
+
+
+# Порядок ключей совпадает с сортировкой ленты сообществ
+Index(
+    "ix_communities_date_create_id",
+    Communities.date_create.desc(),
+    Communities.id.desc(),
+)
@@ -3,6 +3,7 @@ from typing import Mapping
 from sqlalchemy import String, DateTime, func, ForeignKey, Text
 from sqlalchemy.ext.associationproxy import association_proxy
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -18,7 +19,7 @@ class Post(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         comment="id поста"
     )
 
@@ -49,12 +50,14 @@ class Post(Base):
         UUID(as_uuid=True),
         ForeignKey('users.id'),
         nullable=False,
+        index=True,
         comment="ID автора поста"
     )
     communities_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('communities.id'),
         nullable=False,
+        index=True,
         comment="ID сообщества"
     )
 
@@ -10,6 +10,7 @@ from typing import List
 
 
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 
 
 class Topic(Base):
@@ -20,7 +21,7 @@ class Topic(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         comment="id темы"
     )
 
@@ -1,8 +1,9 @@
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, String, DateTime, func, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Boolean, String, DateTime, func, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -19,7 +20,7 @@ class TopicPost(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         comment="id"
     )
 
@@ -32,6 +33,10 @@ class TopicPost(Base):
         ForeignKey('post.id')
     )
 
+    __table_args__ = (
+        Index('ix_topic_post_topic_id_post_id', 'topic_id', 'post_id'),
+    )
+
     # Определяем отношения с Post и Topic
     topic: Mapped['Topic'] = relationship(
         'Topic', back_populates='topic_posts')
@@ -6,6 +6,7 @@ import uuid
 from typing import List
 
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 
 
 class User(Base):
@@ -16,7 +17,7 @@ class User(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         comment="id пользователя"
     )
     username: Mapped[str] = mapped_column(
@@ -1,4 +1,5 @@
 from app.db.base import Base
+from app.utils.uuid7 import uuid7
 
 from datetime import datetime
 
@@ -15,14 +16,15 @@ class UserCommunity(Base):
     __tablename__ = 'user_community'
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4,)
+        UUID(as_uuid=True), primary_key=True, default=uuid7,)
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey('users.id')
     )
     community_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
-        ForeignKey('communities.id')
+        ForeignKey('communities.id'),
+        index=True
     )
     date_joined: Mapped[datetime] = mapped_column(
         DateTime,
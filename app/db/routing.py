@@ -0,0 +1,78 @@
+import itertools
+
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+
+# Ключ в session.info: общее для всех сессий запроса состояние маршрутизации
+ROUTING_STATE = "routing_state"
+
+
+class ReplicaSelector:
+    """Выбор реплики для чтения: по кругу или с наименьшим числом занятых соединений"""
+
+    def __init__(self, engines: list[AsyncEngine], strategy: str = "round_robin") -> None:
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Неизвестная стратегия выбора реплики: {strategy!r}")
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines) if engines else None
+
+    def select(self) -> AsyncEngine | None:
+        if not self.engines:
+            return None
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda engine: engine.pool.checkedout())
+        return next(self._cycle)
+
+
+def pin_to_primary(session: Session) -> None:
+    """После записи все чтения запроса идут на primary (read-your-writes)"""
+    state = session.info.get(ROUTING_STATE)
+    if state is not None:
+        state["primary_pinned"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _pin_after_flush(session, flush_context):
+    pin_to_primary(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _pin_after_orm_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        pin_to_primary(orm_execute_state.session)
+
+
+class RoutingSession(Session):
+    """
+    Сессия чтения: SELECT уходят на реплику, запись и блокирующие чтения - на primary.
+
+    Реплика выбирается один раз на сессию, чтобы чтения запроса не
+    переключались между репликами с разным отставанием. После записи в
+    любой сессии того же запроса чтения возвращаются на primary. Это не
+    делает видимыми незафиксированные изменения единицы работы: их видит
+    только её сессия.
+
+    Между запросами согласованность не гарантируется: кэш, заполненный с
+    реплики сразу после инвалидации, может отставать от primary на
+    задержку репликации в момент загрузки.
+    """
+    primary: AsyncEngine
+    replicas: ReplicaSelector
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        state = self.info.get(ROUTING_STATE) or {}
+        is_write = self._flushing or isinstance(clause, (Insert, Update, Delete))
+        is_locking = getattr(clause, "_for_update_arg", None) is not None
+        if is_write:
+            pin_to_primary(self)
+        if is_write or is_locking or state.get("primary_pinned"):
+            return self.primary.sync_engine
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.replicas.select() or self.primary
+            self.info["replica"] = replica
+        return replica.sync_engine
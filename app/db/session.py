@@ -1,38 +1,172 @@
-from typing import Generator
+from functools import partial
+from typing import Callable, Generator
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.db.routing import ROUTING_STATE, ReplicaSelector, RoutingSession
+from app.db.instrumentation import instrument_engine
+
+import logging
 
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from app.core.metrics import metrics
 
-# Подключение к Redis
+# Подключение к Redis: один пул на процесс, создаётся в lifespan
+_redis_pool: redis.BlockingConnectionPool | None = None
 
 
-async def get_redis():
-    client = redis.from_url(
+def init_redis_pool() -> redis.BlockingConnectionPool:
+    global _redis_pool
+    _redis_pool = redis.BlockingConnectionPool.from_url(
         settings.get_redis_url(),
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        retry=Retry(
+            ExponentialBackoff(
+                cap=settings.redis_retry_backoff_cap,
+                base=settings.redis_retry_backoff_base),
+            settings.redis_retry_attempts,
+            supported_errors=(RedisConnectionError, RedisTimeoutError),
+        ),
         encoding="utf-8",
         decode_responses=True
     )
-    try:
-        yield client
-    finally:
-        await client.close()
+    metrics.register_gauge("redis_pool", get_redis_pool_stats)
+    return _redis_pool
+
+
+def get_redis_pool() -> redis.BlockingConnectionPool:
+    if _redis_pool is None:
+        return init_redis_pool()
+    return _redis_pool
+
+
+async def close_redis_pool() -> None:
+    global _redis_pool
+    if _redis_pool is not None:
+        await _redis_pool.aclose()
+        _redis_pool = None
+
+
+def get_redis_pool_stats() -> dict:
+    if _redis_pool is None:
+        return {}
+    in_use = len(_redis_pool._in_use_connections)
+    return {
+        "in_use": in_use,
+        "idle": len(_redis_pool._available_connections),
+        "max_connections": _redis_pool.max_connections,
+        "utilisation": round(in_use / _redis_pool.max_connections, 3),
+    }
+
+
+def create_redis_client() -> redis.Redis:
+    return redis.Redis(connection_pool=get_redis_pool())
+
+
+def get_redis() -> redis.Redis:
+    """Клиент поверх общего пула, закрывать не нужно"""
+    return create_redis_client()
 
 DATABASE_URL = settings.get_database_string()
 
 # Подключение Базы данных
-engine = create_async_engine(DATABASE_URL, future=True, echo=True)
+engine = create_async_engine(
+    DATABASE_URL, **settings.get_engine_options(echo=settings.db_echo))
 
 async_session = sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession)
 
+# Реплики для чтения
+replica_engines = [
+    create_async_engine(url, **settings.get_engine_options(echo=settings.db_echo))
+    for url in settings.get_replica_database_strings()
+]
+
+
+class ReadRoutingSession(RoutingSession):
+    primary = engine
+    replicas = ReplicaSelector(replica_engines, settings.db_replica_strategy)
+
+
+async_read_session = sessionmaker(
+    expire_on_commit=False, class_=AsyncSession, sync_session_class=ReadRoutingSession)
 
-async def get_db() -> Generator:
+
+def _get_routing_state(request: Request) -> dict:
+    """Состояние маршрутизации, общее для всех сессий одного запроса"""
+    state = getattr(request.state, "db_routing", None)
+    if state is None:
+        state = {"primary_pinned": False}
+        request.state.db_routing = state
+    return state
+
+
+async def get_db(request: Request) -> Generator:
     """Dependency for getting async session"""
     try:
-        session: AsyncSession = async_session()
+        session: AsyncSession = async_session(
+            info={ROUTING_STATE: _get_routing_state(request)})
+        yield session
+    finally:
+        await session.close()
+
+
+def get_db_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    """
+    Фабрика коротких сессий primary для сервиса, которому нужно вернуть
+    соединение в пул до конца запроса. Сессии открывает и закрывает сервис.
+    """
+    state = _get_routing_state(request)
+    return partial(async_session, info={ROUTING_STATE: state})
+
+
+async def get_read_db(request: Request) -> Generator:
+    """Сессия для чтения: реплика, а после записи в этом же запросе - primary"""
+    try:
+        session: AsyncSession = async_read_session(
+            info={ROUTING_STATE: _get_routing_state(request)})
         yield session
     finally:
         await session.close()
+
+
+if settings.sql_instrumentation_enabled:
+    for db_engine in (engine, *replica_engines):
+        instrument_engine(db_engine)
+
+
+async def close_db_engines() -> None:
+    for db_engine in (engine, *replica_engines):
+        await db_engine.dispose()
+
+
+def log_pool_configuration() -> None:
+    """Фактические параметры пула для расчёта соединений относительно max_connections"""
+    per_worker = settings.db_pool_size + settings.db_max_overflow
+    logging.getLogger(__name__).info(
+        "Пул соединений БД",
+        extra={
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "statement_cache_size": settings.db_statement_cache_size,
+            "echo": settings.db_echo,
+            "max_connections_per_worker": per_worker,
+            "workers": settings.web_concurrency,
+            "max_connections_total": per_worker * settings.web_concurrency,
+            "replicas": len(replica_engines),
+            "replica_strategy": settings.db_replica_strategy,
+        }
+    )
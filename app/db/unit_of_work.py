@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Awaitable, Callable
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from app.db.session import get_db
+from app.utils.mixins import LoggerMixin
+
+
+AfterCommitCallback = Callable[[], Awaitable[None]]
+
+
+class UnitOfWork(LoggerMixin):
+    """
+    Одна транзакция на запрос.
+
+    DAL только добавляют объекты и делают flush(), фиксация выполняется
+    один раз при завершении зависимости get_unit_of_work, а при ошибке
+    обработчика транзакция откатывается целиком. Действия, которые нельзя
+    выполнять до фиксации (инвалидация кэша и т.п.), регистрируются через
+    after_commit.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._after_commit: list[AfterCommitCallback] = []
+
+    def after_commit(self, callback: AfterCommitCallback) -> None:
+        """
+        Регистрация действия после успешной фиксации транзакции
+
+        :param callback: Корутинная функция без аргументов
+        """
+        self._after_commit.append(callback)
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncGenerator[AsyncSessionTransaction, None]:
+        """
+        Явная точка сохранения: ошибка внутри блока откатывает только его,
+        внешняя транзакция запроса продолжается
+        """
+        async with self.session.begin_nested() as nested:
+            yield nested
+
+    async def commit(self) -> None:
+        """Фиксация транзакции и выполнение отложенных действий"""
+        if self.session.in_transaction():
+            await self.session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                # Транзакция уже зафиксирована, ошибка действия не отменяет запрос
+                self.logger.error("Ошибка действия после фиксации транзакции",
+                                  extra={"error": str(e)}, exc_info=True)
+
+    async def rollback(self) -> None:
+        """Откат транзакции, отложенные действия отбрасываются"""
+        self._after_commit.clear()
+        if self.session.in_transaction():
+            await self.session.rollback()
+
+
+async def get_unit_of_work(session: AsyncSession = Depends(get_db)) -> AsyncGenerator[UnitOfWork, None]:
+    """
+    Dependency единицы работы запроса
+
+    Сессия та же, что и у остальных зависимостей get_db в этом запросе.
+    """
+    uow = UnitOfWork(session)
+    try:
+        yield uow
+    except BaseException:
+        await uow.rollback()
+        raise
+    await uow.commit()
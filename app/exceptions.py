@@ -42,4 +42,22 @@ class FileSaveError(ApplicationException):
 
 class PermissionsError(ApplicationException):
     """Исключение вызывается когда недостаточно прав у пользователя"""
-    pass
\ No newline at end of file
+    pass
+
+
+class PasswordHasherBusyException(ApplicationException):
+    """Исключение вызывается когда пул хэширования паролей перегружен"""
+    pass
+
+
+class TooManyRequestsException(ApplicationException):
+    """Исключение вызывается при превышении лимита запросов"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InvalidCursorException(ApplicationException):
+    """Исключение вызывается при повреждённом или чужом курсоре пагинации"""
+    pass
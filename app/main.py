@@ -4,15 +4,17 @@ import logging
 from app.config import settings
 from app.api import router as api_router
 from app.config.logging import ExtendedConfigLogger
-from app.api.middleware.middlewares import LoggingMiddleware
+from app.api.middleware.middlewares import LoggingMiddleware, QueryStatsMiddleware
+from app.core.lifespan import lifespan
 
 ExtendedConfigLogger.get_log_config()
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ConnectNest")
+app = FastAPI(title="ConnectNest", lifespan=lifespan)
 app.include_router(api_router)
 
+app.add_middleware(QueryStatsMiddleware)
 app.add_middleware(LoggingMiddleware)
 
 logger.info(f"Приложение запущено на {settings.app_host}:{settings.app_port}")
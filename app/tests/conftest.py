@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+
+# Настройки приложения читаются при импорте app.config. Тестам не нужны
+# настоящие Postgres и Redis, поэтому обязательные параметры получают
+# значения по умолчанию, если окружение их не задало
+for name, value in {
+    "APP_HOST": "127.0.0.1",
+    "APP_PORT": "8000",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "postgres",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "PAGINATION_CURSOR_SECRET": "test-cursor-secret-test-cursor-secret",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
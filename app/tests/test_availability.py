@@ -0,0 +1,50 @@
+import pytest
+
+from app.api.auth.availability import AvailabilityService
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Filter:
+    def __init__(self, known: set[str]) -> None:
+        self.known = known
+
+    async def might_contain_username(self, username):
+        return username in self.known
+
+    async def might_contain_email(self, email):
+        return email in self.known
+
+
+class UserDal:
+    def __init__(self, existing: set[str]) -> None:
+        self.existing = existing
+        self.queries = []
+
+    async def username_exists(self, username):
+        self.queries.append(username)
+        return username in self.existing
+
+    async def email_exists(self, email):
+        self.queries.append(email)
+        return email in self.existing
+
+
+async def test_value_missing_from_filter_skips_database():
+    user_dal = UserDal(existing=set())
+    service = AvailabilityService(Filter(known=set()), user_dal)
+
+    assert await service.check(username="alice", email="alice@example.com") == {
+        "username": True, "email": True}
+    assert user_dal.queries == []
+
+
+async def test_possible_match_is_confirmed_by_database():
+    # bob - ложноположительный ответ фильтра
+    user_dal = UserDal(existing={"alice"})
+    service = AvailabilityService(Filter(known={"alice", "bob"}), user_dal)
+
+    assert await service.check(username="alice") == {"username": False}
+    assert await service.check(username="bob") == {"username": True}
+    assert user_dal.queries == ["alice", "bob"]
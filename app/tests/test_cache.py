@@ -0,0 +1,200 @@
+import asyncio
+import fnmatch
+import time
+
+import pytest
+
+from app.core.cache import RELEASE_LOCK_SCRIPT, VersionedCache
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    """Команды Redis, которые использует VersionedCache; TTL не соблюдаются"""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        assert script == RELEASE_LOCK_SCRIPT
+        key, token = args
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def unlink(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+
+class CountingLoader:
+    def __init__(self, value: str = "value", delay: float = 0.05) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture(autouse=True)
+def clean_tasks():
+    yield
+    VersionedCache._inflight.clear()
+    VersionedCache._background.clear()
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(redis_client):
+    return VersionedCache(redis_client, "test", ttl=60, stale_ttl=60, beta=0,
+                          lock_timeout=0.3, poll_interval=0.01)
+
+
+async def drain_background() -> None:
+    await asyncio.gather(*VersionedCache._background)
+
+
+async def test_concurrent_misses_load_once(cache, redis_client):
+    key = await cache.key("all")
+    loader = CountingLoader()
+
+    values = await asyncio.gather(*(cache.get_or_load(key, loader) for _ in range(20)))
+
+    assert values == ["value"] * 20
+    assert loader.calls == 1
+    assert await cache.get(key) == "value"
+    assert f"{key}:lock" not in redis_client.data
+
+
+async def test_fresh_entry_is_served_without_load(cache):
+    key = await cache.key("all")
+    await cache.set(key, "cached")
+    loader = CountingLoader()
+
+    assert await cache.get_or_load(key, loader) == "cached"
+    assert loader.calls == 0
+
+
+async def test_stale_entry_is_served_while_refreshing(cache, redis_client):
+    key = await cache.key("all")
+    redis_client.data[key] = f"{time.time() - 1:.3f}:0.0100:old"
+    loader = CountingLoader("new")
+
+    values = await asyncio.gather(*(cache.get_or_load(key, loader) for _ in range(5)))
+
+    assert values == ["old"] * 5
+    await drain_background()
+    assert loader.calls == 1
+    assert await cache.get(key) == "new"
+
+
+async def test_early_refresh_near_expiry(redis_client):
+    cache = VersionedCache(redis_client, "test", ttl=60, beta=1.0)
+    key = await cache.key("all")
+    # Загрузка дольше оставшегося времени свежести: обновление почти наверняка
+    redis_client.data[key] = f"{time.time() + 0.001:.3f}:100.0000:old"
+    loader = CountingLoader("new", delay=0)
+
+    assert await cache.get_or_load(key, loader) == "old"
+    await drain_background()
+    assert loader.calls == 1
+
+
+async def test_waits_for_peer_holding_lock(cache, redis_client):
+    key = await cache.key("all")
+    redis_client.data[f"{key}:lock"] = "peer"
+    loader = CountingLoader()
+
+    async def peer():
+        await asyncio.sleep(0.05)
+        await VersionedCache(redis_client, "test", ttl=60).set(key, "from peer")
+
+    value, _ = await asyncio.gather(cache.get_or_load(key, loader), peer())
+
+    assert value == "from peer"
+    assert loader.calls == 0
+
+
+async def test_loads_itself_after_peer_lock_timeout(cache, redis_client):
+    key = await cache.key("all")
+    redis_client.data[f"{key}:lock"] = "peer"
+    loader = CountingLoader()
+
+    started = time.monotonic()
+    assert await cache.get_or_load(key, loader) == "value"
+
+    assert time.monotonic() - started >= cache.lock_timeout
+    assert loader.calls == 1
+    # Чужая блокировка не снимается
+    assert redis_client.data[f"{key}:lock"] == "peer"
+
+
+async def test_background_refresh_yields_to_peer(cache, redis_client):
+    key = await cache.key("all")
+    redis_client.data[key] = f"{time.time() - 1:.3f}:0.0100:old"
+    redis_client.data[f"{key}:lock"] = "peer"
+    loader = CountingLoader("new")
+
+    assert await cache.get_or_load(key, loader) == "old"
+    await drain_background()
+    assert loader.calls == 0
+
+
+async def test_failed_load_releases_lock(cache, redis_client):
+    key = await cache.key("all")
+
+    async def failing():
+        raise RuntimeError("db is down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load(key, failing)
+
+    assert f"{key}:lock" not in redis_client.data
+    assert VersionedCache._inflight == {}
+
+
+async def test_invalidate_changes_key(cache):
+    old_key = await cache.key("all")
+    await cache.set(old_key, "cached")
+
+    assert await cache.invalidate() == 1
+
+    new_key = await cache.key("all")
+    assert new_key != old_key
+    assert await cache.get(new_key) is None
+
+
+async def test_purge_keeps_generation(cache, redis_client):
+    await cache.invalidate()
+    for part in range(3):
+        await cache.set(await cache.key(part), "cached")
+    redis_client.data["cache:other:v0:all"] = "other namespace"
+
+    assert await cache.purge(batch_size=2) == 3
+    assert set(redis_client.data) == {cache._generation_key, "cache:other:v0:all"}
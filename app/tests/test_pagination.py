@@ -0,0 +1,260 @@
+"""
+Курсорная пагинация: подпись курсора и обход страниц в обе стороны.
+
+Запросы выполняются на SQLite в памяти через синхронную сессию, обёрнутую
+в awaitable execute - KeysetPaginator больше ничего от сессии не использует.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import DateTime, Integer, String, create_engine, delete, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+import app.api.auth.utils_jwt as utils_jwt
+from app.api.auth.utils_jwt import JWTManager
+from app.config import settings
+from app.config.components.pagination import PaginationConfig
+from app.core.pagination import (
+    ADJUST_COUNT_SCRIPT, CachedCountService, CursorCodec, KeysetPaginator, adjust_cached_count, get_cursor_secret)
+from app.exceptions import InvalidCursorException
+
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+ITEMS = 25
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    title: Mapped[str] = mapped_column(String(50))
+    group: Mapped[int] = mapped_column(Integer)
+    date_create: Mapped[datetime] = mapped_column(DateTime())
+
+
+class ItemTitle(BaseModel):
+    title: str
+
+
+class SyncSessionAdapter:
+    """await session.execute(...) поверх синхронной сессии"""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def execute(self, query):
+        return self.session.execute(query)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as sync_session:
+        # Совпадающие даты у соседних строк проверяют добавленный ключ id
+        sync_session.add_all([
+            Item(id=i, title=f"item {i}", group=i % 3, date_create=START + timedelta(minutes=i // 2))
+            for i in range(1, ITEMS + 1)
+        ])
+        sync_session.commit()
+        yield SyncSessionAdapter(sync_session)
+    engine.dispose()
+
+
+@pytest.fixture
+def codec():
+    return CursorCodec("secret")
+
+
+async def walk_forward(session, query, codec, size, schema=None):
+    pages, cursor = [], None
+    while True:
+        items, next_cursor, prev_cursor = await KeysetPaginator(
+            Item, query, size=size, cursor=cursor, codec=codec, schema=schema).execute(session)
+        pages.append((items, next_cursor, prev_cursor))
+        if next_cursor is None:
+            return pages
+        cursor = next_cursor
+
+
+def test_codec_round_trip(codec):
+    values = [START, START.date(), uuid.UUID(int=7), Decimal("1.50"), 3, "text"]
+    cursor = codec.encode(["a", "b", "c", "d", "e", "f"], values, "next")
+
+    assert codec.decode(cursor, ["a", "b", "c", "d", "e", "f"]) == (values, "next")
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "a.b.c", "!!!.???"])
+def test_codec_rejects_malformed_cursor(codec, cursor):
+    with pytest.raises(InvalidCursorException):
+        codec.decode(cursor, ["id"])
+
+
+def test_codec_rejects_tampered_payload(codec):
+    payload, signature = codec.encode(["id"], [1], "next").split(".")
+    forged = CursorCodec("other").encode(["id"], [999], "next").split(".")[0]
+
+    with pytest.raises(InvalidCursorException):
+        codec.decode(f"{forged}.{signature}", ["id"])
+    with pytest.raises(InvalidCursorException):
+        CursorCodec("other").decode(f"{payload}.{signature}", ["id"])
+
+
+def test_codec_rejects_cursor_of_other_sort(codec):
+    cursor = codec.encode(["date_create", "id"], [START, 1], "next")
+
+    with pytest.raises(InvalidCursorException):
+        codec.decode(cursor, ["id"])
+
+
+async def test_forward_walk_visits_every_row_once(session, codec):
+    query = select(Item).order_by(Item.date_create.desc())
+    pages = await walk_forward(session, query, codec, size=10)
+
+    ids = [item.id for items, _, _ in pages for item in items]
+    assert ids == sorted(range(1, ITEMS + 1), key=lambda i: (-(i // 2), -i))
+    assert [len(items) for items, _, _ in pages] == [10, 10, 5]
+    assert pages[0][2] is None
+    assert all(prev_cursor is not None for _, _, prev_cursor in pages[1:])
+
+
+async def test_backward_walk_returns_previous_pages(session, codec):
+    query = select(Item).order_by(Item.date_create.desc())
+    pages = await walk_forward(session, query, codec, size=10)
+
+    items, next_cursor, prev_cursor = await KeysetPaginator(
+        Item, query, size=10, cursor=pages[2][2], codec=codec).execute(session)
+    assert [item.id for item in items] == [item.id for item in pages[1][0]]
+    assert next_cursor is not None
+
+    items, _, prev_cursor = await KeysetPaginator(
+        Item, query, size=10, cursor=prev_cursor, codec=codec).execute(session)
+    assert [item.id for item in items] == [item.id for item in pages[0][0]]
+    assert prev_cursor is None
+
+
+async def test_mixed_directions(session, codec):
+    query = select(Item).order_by(Item.group.asc(), Item.date_create.desc())
+    pages = await walk_forward(session, query, codec, size=4)
+
+    ids = [item.id for items, _, _ in pages for item in items]
+    expected = [
+        item.id for item in sorted(
+            session.session.scalars(select(Item)).all(),
+            key=lambda item: (item.group, -item.date_create.timestamp(), -item.id))
+    ]
+    assert ids == expected
+
+
+async def test_projection_returns_mappings(session, codec):
+    query = select(Item).order_by(Item.date_create.desc())
+    pages = await walk_forward(session, query, codec, size=10, schema=ItemTitle)
+
+    titles = [ItemTitle.model_validate(row).title for items, _, _ in pages for row in items]
+    assert len(titles) == ITEMS
+    assert titles[0] == f"item {ITEMS}"
+
+
+async def test_empty_page_has_no_cursors(session, codec):
+    query = select(Item).where(Item.id < 0).order_by(Item.date_create.desc())
+
+    assert await KeysetPaginator(Item, query, size=10, codec=codec).execute(session) == ([], None, None)
+
+
+def write_key(directory) -> tuple:
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    private_path, public_path = directory / "private.pem", directory / "public.pem"
+    private_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    public_path.write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo))
+    return private_path, public_path
+
+
+def test_cursor_secret_is_derived_from_jwt_key(tmp_path, monkeypatch):
+    manager = JWTManager(*write_key(tmp_path), "EdDSA")
+    monkeypatch.setattr(utils_jwt, "_jwt_manager", manager)
+    monkeypatch.setattr(settings, "pagination_cursor_secret", None)
+
+    secret = get_cursor_secret()
+    # Другой воркер с тем же ключом получает тот же секрет
+    assert JWTManager(manager.private_key_path, manager.public_key_path, "EdDSA").derive_secret(
+        "pagination-cursor") == secret
+    assert manager.derive_secret("other") != secret
+
+    write_key(tmp_path)
+    manager.reload_keys()
+    assert get_cursor_secret() != secret
+
+
+def test_explicit_cursor_secret_must_be_long():
+    with pytest.raises(ValidationError):
+        PaginationConfig(pagination_cursor_secret="change-me")
+    assert PaginationConfig(pagination_cursor_secret="x" * 32).pagination_cursor_secret == "x" * 32
+
+
+class CountRedis:
+    """Команды Redis счётчика; истечение TTL тест имитирует удалением ключа"""
+
+    def __init__(self) -> None:
+        self.data: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = int(value)
+        return True
+
+    async def eval(self, script, numkeys, key, delta):
+        assert script == ADJUST_COUNT_SCRIPT
+        if key not in self.data:
+            return None
+        self.data[key] += int(delta)
+        return self.data[key]
+
+
+async def test_cached_count_follows_adjustments(session):
+    redis_client = CountRedis()
+    service = CachedCountService(select(Item), redis_client, "item_count")
+
+    assert await service.count(session) == ITEMS
+
+    session.session.add(Item(id=100, title="new", group=0, date_create=START))
+    session.session.commit()
+    await adjust_cached_count(redis_client, "item_count", 1)
+    assert await service.count(session) == ITEMS + 1
+
+
+async def test_adjustment_does_not_create_missing_counter():
+    redis_client = CountRedis()
+
+    await adjust_cached_count(redis_client, "item_count", 1)
+
+    assert redis_client.data == {}
+
+
+async def test_unadjusted_delete_drifts_until_ttl(session):
+    redis_client = CountRedis()
+    service = CachedCountService(select(Item), redis_client, "item_count")
+    await service.count(session)
+
+    session.session.execute(delete(Item).where(Item.id == 1))
+    session.session.commit()
+    assert await service.count(session) == ITEMS
+
+    del redis_client.data["item_count"]
+    assert await service.count(session) == ITEMS - 1
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from starlette.requests import Request
+
+from app.api.auth.security import AsyncPasswordHasher
+from app.api.auth.service import AuthService
+from app.api.auth.user_dal import UserDataAccessLayer
+from app.api.auth.views import login_user
+from app.config import settings
+from app.exceptions import PasswordHasherBusyException
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def release():
+    """Событие, которое держит занятые слоты пула до конца теста"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def hasher():
+    hasher = AsyncPasswordHasher(max_workers=2, max_concurrency=1, max_waiting=1, queue_timeout=5)
+    yield hasher
+    hasher.shutdown()
+
+
+async def occupy(hasher: AsyncPasswordHasher, release: threading.Event) -> asyncio.Task:
+    task = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0.05)
+    return task
+
+
+async def test_hash_and_verify_run_in_pool(hasher):
+    hashed = await hasher.hash("secret")
+
+    assert await hasher.verify("secret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+
+
+async def test_rejects_when_queue_is_full(hasher, release):
+    running = await occupy(hasher, release)
+    waiting = await occupy(hasher, release)
+    assert hasher._waiting == 1
+
+    with pytest.raises(PasswordHasherBusyException):
+        await hasher.hash("secret")
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    assert hasher._waiting == 0
+
+
+async def test_rejects_after_queue_timeout(release):
+    hasher = AsyncPasswordHasher(max_concurrency=1, max_waiting=10, queue_timeout=0.1)
+    try:
+        running = await occupy(hasher, release)
+
+        with pytest.raises(PasswordHasherBusyException):
+            await hasher.hash("secret")
+        assert hasher._waiting == 0
+
+        release.set()
+        await running
+    finally:
+        hasher.shutdown()
+
+
+async def test_waiting_call_runs_when_slot_frees(hasher, release):
+    running = await occupy(hasher, release)
+    waiting = asyncio.create_task(hasher._run(lambda: "done"))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    release.set()
+    await running
+    assert await waiting == "done"
+
+
+async def test_login_returns_503_when_hasher_is_busy():
+    class BusyAuthService:
+        async def authenticate_user(self, username, password):
+            raise PasswordHasherBusyException("Сервис временно перегружен, повторите попытку позже")
+
+    class AllowAll:
+        async def check(self, username, client_ip):
+            return None
+
+    request = Request({"type": "http", "client": ("127.0.0.1", 1000), "headers": []})
+    form = OAuth2PasswordRequestForm(username="user", password="secret")
+
+    with pytest.raises(HTTPException) as error:
+        await login_user(request, form, BusyAuthService(), AllowAll())
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+
+
+async def test_login_releases_session_before_hashing(monkeypatch):
+    events = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            events.append("session closed")
+
+    class Hasher:
+        async def verify(self, password, hashed):
+            events.append("verify")
+            return True
+
+    async def get_user_by_username(self, username):
+        events.append("select")
+        return SimpleNamespace(username=username, password="hashed")
+
+    monkeypatch.setattr(UserDataAccessLayer, "get_user_by_username", get_user_by_username)
+    monkeypatch.setattr(settings, "login_min_response_ms", 0)
+    service = AuthService(db_session=None, jwt_manager=None, password_hasher=Hasher(), session_factory=Session)
+
+    assert await service.authenticate_user("user", "secret") is not None
+    assert events == ["select", "session closed", "verify"]
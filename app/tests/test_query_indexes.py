@@ -0,0 +1,168 @@
+"""
+Запросы горячих путей используют индексы из миграции 0002_hot_path_indexes.
+
+Нужен PostgreSQL: адрес задаётся TEST_DATABASE_URL (postgresql+asyncpg://...),
+без него тесты пропускаются. Таблицы и индексы создаются по моделям, которые
+объявляют те же индексы, что и миграция, во временной схеме, удаляемой после
+прогона. Запросы берутся из DAL и сервисов как есть: SQL перехватывается
+перед выполнением и повторяется под EXPLAIN. Последовательное сканирование
+запрещено, поэтому план показывает, применим ли индекс к форме запроса,
+независимо от объёма тестовых данных.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.auth.user_dal import UserDataAccessLayer
+from app.api.communities.communities_dal import CommunityDataAccessLayer
+from app.api.communities.service import ReadCommunotyService
+from app.core.enums import PaginationStrategy
+from app.db.base import Base
+from app.db.models.communities import Communities
+from app.db.models.user import User
+import app.db.models.post  # noqa: F401  регистрация всех таблиц в Base.metadata
+import app.db.models.topic  # noqa: F401
+import app.db.models.topic_post  # noqa: F401
+import app.db.models.user_communities  # noqa: F401
+
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан"),
+]
+
+USERS = 200
+COMMUNITIES = 2000
+
+
+@pytest.fixture
+async def engine():
+    schema = f"explain_test_{uuid.uuid4().hex[:8]}"
+    admin_engine = create_async_engine(TEST_DATABASE_URL)
+    async with admin_engine.begin() as connection:
+        await connection.execute(text(f"CREATE SCHEMA {schema}"))
+
+    test_engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"server_settings": {"search_path": schema, "enable_seqscan": "off"}})
+    try:
+        async with test_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await seed(test_engine)
+        yield test_engine
+    finally:
+        await test_engine.dispose()
+        async with admin_engine.begin() as connection:
+            await connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin_engine.dispose()
+
+
+async def seed(engine) -> None:
+    now = datetime.now()
+    async with AsyncSession(engine) as session:
+        users = [
+            User(username=f"user{i}", email=f"user{i}@example.com", password="x")
+            for i in range(USERS)
+        ]
+        session.add_all(users)
+        await session.flush()
+        session.add_all([
+            Communities(
+                title=f"community {i}",
+                description="description",
+                image_logo="",
+                date_create=now - timedelta(seconds=i),
+                admin_id=users[i % USERS].id,
+            )
+            for i in range(COMMUNITIES)
+        ])
+        await session.commit()
+    async with engine.begin() as connection:
+        await connection.execute(text("ANALYZE"))
+
+
+@pytest.fixture
+async def explain(engine):
+    """Планы запросов, выполненных через ctx.session внутри async with explain() as ctx"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    class Explain:
+        def __init__(self) -> None:
+            self.session = AsyncSession(engine, expire_on_commit=False)
+            self.plans: list[str] = []
+
+        async def __aenter__(self) -> "Explain":
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            return self
+
+        async def __aexit__(self, *exc) -> None:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            await self.session.close()
+            async with engine.connect() as connection:
+                for statement, parameters in captured:
+                    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                    self.plans.append("\n".join(row[0] for row in result))
+            captured.clear()
+
+    return Explain
+
+
+def assert_uses_index(plans: list[str], index: str) -> None:
+    assert any(index in plan for plan in plans), "\n\n".join(plans)
+
+
+async def test_community_feed_uses_sort_index(explain):
+    async with explain() as ctx:
+        await CommunityDataAccessLayer(ctx.session).get_all()
+    assert_uses_index(ctx.plans, "ix_communities_date_create_id")
+    assert "Sort" not in ctx.plans[0]
+
+
+async def test_community_listing_page_uses_sort_index(explain):
+    async with explain() as ctx:
+        await ReadCommunotyService(ctx.session, None)._load_page(
+            ctx.session, page=50, size=10, strategy=PaginationStrategy.NO_TOTAL)
+    assert_uses_index(ctx.plans, "ix_communities_date_create_id")
+    assert "Sort" not in ctx.plans[0]
+
+
+async def test_community_cursor_page_uses_sort_index(explain):
+    async with explain() as ctx:
+        service = ReadCommunotyService(ctx.session, None)
+        first = await service.get_by_cursor(None, 10)
+        await service.get_by_cursor(first.next_cursor, 10)
+    assert len(ctx.plans) == 2
+    for plan in ctx.plans:
+        assert "ix_communities_date_create_id" in plan, plan
+        assert "Sort" not in plan, plan
+
+
+async def test_communities_by_admin_use_admin_index(explain, engine):
+    async with AsyncSession(engine) as session:
+        admin_id = (await session.execute(text("SELECT id FROM users LIMIT 1"))).scalar_one()
+    async with explain() as ctx:
+        await CommunityDataAccessLayer(ctx.session).get_all_by_admin(admin_id)
+    assert_uses_index(ctx.plans, "ix_communities_admin_id")
+
+
+async def test_login_lookup_uses_username_index(explain):
+    async with explain() as ctx:
+        await UserDataAccessLayer(ctx.session).get_user_by_username("user7")
+        await UserDataAccessLayer(ctx.session).username_exists("user7")
+    for plan in ctx.plans:
+        assert "users_username_key" in plan, plan
+
+
+async def test_email_lookup_uses_email_index(explain):
+    async with explain() as ctx:
+        await UserDataAccessLayer(ctx.session).email_exists("user7@example.com")
+    assert_uses_index(ctx.plans, "users_email_key")
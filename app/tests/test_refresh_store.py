@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+from app.api.auth.refresh_store import REVOKED_KEY, RefreshTokenStore, RevocationFilter
+
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "user"
+
+
+class FakePipeline:
+    def __init__(self, redis_client: "FakeRedis") -> None:
+        self.redis_client = redis_client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.calls:
+            results.append(await getattr(self.redis_client, name)(*args, **kwargs))
+        self.calls.clear()
+        return results
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+class FakeRedis:
+    """Общее хранилище нескольких воркеров; TTL не соблюдаются"""
+
+    def __init__(self) -> None:
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.strings: dict[str, str] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    async def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    async def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return items if withscores else [member for member, _ in items]
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [member for member, score in zset.items() if score <= high]:
+            del zset[member]
+
+    async def expireat(self, key, when):
+        pass
+
+    async def delete(self, key):
+        self.zsets.pop(key, None)
+        self.strings.pop(key, None)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+def worker(redis_client: FakeRedis) -> RefreshTokenStore:
+    """Хранилище воркера со своим фильтром отозванных токенов"""
+    return RefreshTokenStore(redis_client, RevocationFilter(capacity=100, error_rate=0.01))
+
+
+async def issue(store: RefreshTokenStore, jti: str) -> None:
+    await store.add(USER_ID, jti, time.time() + 3600)
+
+
+async def test_rotation_consumes_token_once(redis_client):
+    store = worker(redis_client)
+    await issue(store, "a")
+
+    assert await store.consume(USER_ID, "a")
+    assert await redis_client.zscore(store._key(USER_ID), "a") is None
+
+
+async def test_logout_then_refresh_on_other_worker_keeps_sessions(redis_client):
+    first, second = worker(redis_client), worker(redis_client)
+    await issue(first, "logged-out")
+    await issue(first, "other-session")
+
+    await first.revoke(USER_ID, "logged-out", time.time() + 3600)
+    # Фильтр второго воркера ещё не синхронизирован и не знает об отзыве
+    assert not await second.is_revoked("logged-out")
+
+    assert not await second.consume(USER_ID, "logged-out")
+    assert await second.consume(USER_ID, "other-session")
+    assert await second.is_revoked("logged-out")
+
+
+async def test_concurrent_refresh_does_not_revoke_sessions(redis_client):
+    store = worker(redis_client)
+    await issue(store, "a")
+    await issue(store, "other-session")
+
+    assert await store.consume(USER_ID, "a")
+    assert not await store.consume(USER_ID, "a")
+
+    assert await redis_client.zscore(REVOKED_KEY, "other-session") is None
+    assert await store.consume(USER_ID, "other-session")
+
+
+async def test_reuse_after_grace_revokes_all_tokens(redis_client):
+    store = worker(redis_client)
+    await issue(store, "a")
+    await issue(store, "other-session")
+
+    assert await store.consume(USER_ID, "a")
+    # Окно параллельных обновлений истекло
+    await redis_client.delete(store._rotated_key("a"))
+
+    assert not await store.consume(USER_ID, "a")
+    assert await store.is_revoked("other-session")
+    assert not await store.consume(USER_ID, "other-session")
+
+
+async def test_sync_picks_up_revocations_of_other_workers(redis_client):
+    first, second = worker(redis_client), worker(redis_client)
+    await issue(first, "a")
+    await first.revoke(USER_ID, "a", time.time() + 3600)
+
+    await second.revoked.sync(redis_client)
+
+    assert "a" in second.revoked
+    assert await second.is_revoked("a")
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.communities.service import ReadCommunotyService
+from app.db.models.communities import Communities
+from app.db.routing import ROUTING_STATE, ReplicaSelector, RoutingSession, pin_to_primary
+
+
+# Движки не подключаются, пока через них ничего не выполняется
+primary = create_async_engine("postgresql+asyncpg://primary/db")
+replica = create_async_engine("postgresql+asyncpg://replica/db")
+
+
+class TestRoutingSession(RoutingSession):
+    __test__ = False
+    primary = primary
+    replicas = ReplicaSelector([replica])
+
+
+@pytest.fixture
+def state():
+    return {"primary_pinned": False}
+
+
+def test_reads_go_to_replica(state):
+    session = TestRoutingSession(info={ROUTING_STATE: state})
+
+    assert session.get_bind(clause=select(Communities)) is replica.sync_engine
+    assert session.get_bind(clause=select(Communities).with_for_update()) is primary.sync_engine
+
+
+def test_write_pins_all_sessions_of_request(state):
+    writer = TestRoutingSession(info={ROUTING_STATE: state})
+    reader = TestRoutingSession(info={ROUTING_STATE: state})
+
+    assert writer.get_bind(clause=insert(Communities)) is primary.sync_engine
+    assert reader.get_bind(clause=select(Communities)) is primary.sync_engine
+
+
+def test_cache_loader_session_shares_request_state(state):
+    request_session = AsyncSession(sync_session_class=TestRoutingSession, info={ROUTING_STATE: state})
+    service = ReadCommunotyService(request_session, None)
+
+    loader_session = service._read_session()
+    pin_to_primary(request_session.sync_session)
+
+    assert loader_session.info[ROUTING_STATE] is state
+    assert state["primary_pinned"]
+
+
+def test_loader_session_without_request_has_own_state():
+    loader_session = ReadCommunotyService(None, None)._read_session()
+
+    assert ROUTING_STATE not in loader_session.info
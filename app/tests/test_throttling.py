@@ -0,0 +1,159 @@
+"""
+Ограничение запросов: IP клиента за прокси и token bucket в Redis.
+
+Скрипт token bucket выполняется в Redis: адрес задаётся TEST_REDIS_URL,
+без него используется fakeredis с поддержкой Lua, если он установлен,
+иначе эти тесты пропускаются.
+"""
+import ipaddress
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from starlette.requests import Request
+
+import app.api.auth.throttling as throttling
+from app.api.auth.throttling import UNKNOWN_CLIENT, AvailabilityThrottle, LoginThrottle, get_client_ip
+from app.api.auth.views import login_user
+from app.core.metrics import metrics
+from app.exceptions import TooManyRequestsException
+
+
+pytestmark = pytest.mark.anyio
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+
+def make_request(client=("203.0.113.7", 1000), forwarded=None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "client": client, "headers": headers})
+
+
+@pytest.fixture
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(throttling, "TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+
+
+def test_forwarded_header_from_untrusted_peer_is_ignored(trusted_proxies):
+    request = make_request(forwarded="198.51.100.1")
+
+    assert get_client_ip(request) == "203.0.113.7"
+
+
+def test_spoofed_forwarded_entries_left_of_proxy_are_ignored(trusted_proxies):
+    # Клиент подставил 198.51.100.1, прокси дописал реальный адрес
+    request = make_request(client=("10.0.0.2", 1000), forwarded="198.51.100.1, 203.0.113.9, 10.0.0.5")
+
+    assert get_client_ip(request) == "203.0.113.9"
+
+
+def test_forwarded_header_of_only_proxies_falls_back_to_peer(trusted_proxies):
+    request = make_request(client=("10.0.0.2", 1000), forwarded="10.0.0.5")
+
+    assert get_client_ip(request) == "10.0.0.2"
+
+
+def test_forwarded_header_ignored_without_trusted_proxies():
+    request = make_request(client=("10.0.0.2", 1000), forwarded="198.51.100.1")
+
+    assert get_client_ip(request) == "10.0.0.2"
+
+
+def test_missing_client_shares_unknown_bucket():
+    assert get_client_ip(make_request(client=None)) == UNKNOWN_CLIENT
+
+
+class ScriptRedis:
+    """Redis, скрипт которого возвращает заданный ответ"""
+
+    def __init__(self, result) -> None:
+        self.result = result
+
+    def register_script(self, script):
+        async def run(keys, args):
+            return self.result
+        return run
+
+
+def make_login_throttle(redis_client) -> LoginThrottle:
+    return LoginThrottle(redis_client, subject_capacity=2, subject_per_minute=1,
+                         ip_capacity=3, ip_per_minute=1)
+
+
+async def test_limited_attempt_reports_retry_after_and_metrics():
+    before = metrics.snapshot()
+    throttle = make_login_throttle(ScriptRedis([0, 17, 3]))
+
+    with pytest.raises(TooManyRequestsException) as error:
+        await throttle.check("user", "203.0.113.7")
+
+    assert error.value.retry_after == 17
+    after = metrics.snapshot()
+    for name in ("login_throttle_limited_username", "login_throttle_limited_ip"):
+        assert after[name] == before.get(name, 0) + 1
+
+
+async def test_login_returns_429_with_retry_after():
+    request = make_request()
+    form = OAuth2PasswordRequestForm(username="user", password="secret")
+
+    with pytest.raises(HTTPException) as error:
+        await login_user(request, form, None, make_login_throttle(ScriptRedis([0, 17, 1])))
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "17"}
+
+
+@pytest.fixture
+async def redis_client():
+    if TEST_REDIS_URL:
+        from redis.asyncio import Redis
+        client = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def unique_ip() -> str:
+    """Отдельный bucket IP на тест, если Redis общий"""
+    return f"test-{uuid.uuid4().hex}"
+
+
+async def test_bucket_script_limits_subject(redis_client, unique_ip):
+    throttle = make_login_throttle(redis_client)
+
+    await throttle.check("alice", unique_ip)
+    await throttle.check("alice", unique_ip)
+    with pytest.raises(TooManyRequestsException) as error:
+        await throttle.check("alice", unique_ip)
+
+    # Пустой bucket пополняется одним токеном в минуту
+    assert 59 <= error.value.retry_after <= 60
+    # Отклонённая попытка не списала токен IP
+    await throttle.check("bob", unique_ip)
+
+
+async def test_bucket_script_limits_ip(redis_client, unique_ip):
+    throttle = make_login_throttle(redis_client)
+
+    for username in ("a", "b", "c"):
+        await throttle.check(username, unique_ip)
+    with pytest.raises(TooManyRequestsException):
+        await throttle.check("d", unique_ip)
+
+
+async def test_throttles_use_separate_buckets(redis_client, unique_ip):
+    login = make_login_throttle(redis_client)
+    availability = AvailabilityThrottle(redis_client, subject_capacity=1, subject_per_minute=1,
+                                        ip_capacity=1, ip_per_minute=1)
+
+    await availability.check("alice", unique_ip)
+    with pytest.raises(TooManyRequestsException):
+        await availability.check("alice", unique_ip)
+    await login.check("alice", unique_ip)
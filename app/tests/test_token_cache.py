@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+import app.api.auth.token_cache as token_cache_module
+import app.api.auth.utils_jwt as utils_jwt
+from app.api.auth.token_cache import VerifiedTokenCache
+from app.api.auth.utils_jwt import JWTManager
+
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(token_cache_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_returns_payload_until_exp(clock):
+    cache = VerifiedTokenCache()
+    cache.set(b"token", {"sub": "1", "exp": NOW + 10})
+
+    assert cache.get(b"token") == {"sub": "1", "exp": NOW + 10}
+
+    clock[0] = NOW + 10
+    assert cache.get(b"token") is None
+    assert cache.stats()["size"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_token_without_exp_is_not_cached(clock):
+    cache = VerifiedTokenCache()
+    cache.set(b"token", {"sub": "1"})
+
+    assert cache.get(b"token") is None
+
+
+def test_returned_payload_is_a_copy(clock):
+    cache = VerifiedTokenCache()
+    cache.set(b"token", {"sub": "1", "exp": NOW + 10})
+
+    cache.get(b"token")["sub"] = "2"
+
+    assert cache.get(b"token")["sub"] == "1"
+
+
+def test_evicts_least_recently_used(clock):
+    cache = VerifiedTokenCache(max_size=2)
+    cache.set(b"a", {"exp": NOW + 10})
+    cache.set(b"b", {"exp": NOW + 10})
+    cache.get(b"a")
+    cache.set(b"c", {"exp": NOW + 10})
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+    assert cache.get(b"c") is not None
+    assert cache.stats()["size"] == 2
+
+
+@pytest.fixture
+def jwt_manager(tmp_path):
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    private_path = tmp_path / "private.pem"
+    public_path = tmp_path / "public.pem"
+    private_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    public_path.write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo))
+    return JWTManager(private_path, public_path, "EdDSA", token_cache=VerifiedTokenCache())
+
+
+def test_cached_token_skips_signature_check(jwt_manager, monkeypatch):
+    token = jwt_manager.encode_jwt({"sub": "1"}, expire_minutes=5)
+    calls = []
+    decode = utils_jwt.jwt.decode
+    monkeypatch.setattr(utils_jwt.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+
+    first = jwt_manager.decode_jwt(token)
+    second = jwt_manager.decode_jwt(token)
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_reload_keys_clears_cache(jwt_manager):
+    token = jwt_manager.encode_jwt({"sub": "1"}, expire_minutes=5)
+    jwt_manager.decode_jwt(token)
+
+    jwt_manager.reload_keys()
+
+    assert jwt_manager.token_cache.stats()["size"] == 0
@@ -0,0 +1,75 @@
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app.utils.uuid7 as uuid7_module
+from app.utils.uuid7 import uuid7
+
+
+def timestamp_ms(value: uuid.UUID) -> int:
+    return value.int >> 80
+
+
+def counter(value: uuid.UUID) -> int:
+    return (value.int >> 64) & 0xFFF
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Часы, которые стоят на месте, пока тест их не сдвинет"""
+    now_ms = [1_700_000_000_000]
+    monkeypatch.setattr(uuid7_module, "time", SimpleNamespace(time_ns=lambda: now_ms[0] * 1_000_000))
+    monkeypatch.setattr(uuid7_module, "_last_ms", 0)
+    monkeypatch.setattr(uuid7_module, "_last_seq", 0)
+    return now_ms
+
+
+def test_version_and_variant_bits():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert (value.int >> 76) & 0xF == 0x7
+    assert (value.int >> 62) & 0b11 == 0b10
+
+
+def test_timestamp_is_unix_time_in_ms():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert before <= timestamp_ms(value) <= after
+
+
+def test_values_are_strictly_increasing():
+    values = [uuid7() for _ in range(10000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_counter_increments_within_one_millisecond(frozen_clock):
+    first, second = uuid7(), uuid7()
+
+    assert timestamp_ms(first) == timestamp_ms(second) == frozen_clock[0]
+    assert counter(second) == counter(first) + 1
+    # Счётчик новой миллисекунды начинается не выше 0x7FF
+    assert counter(first) <= 0x7FF
+
+
+def test_counter_overflow_moves_timestamp_forward(frozen_clock):
+    values = [uuid7() for _ in range(0x1001)]
+
+    assert values == sorted(values)
+    assert timestamp_ms(values[-1]) == frozen_clock[0] + 1
+
+
+def test_clock_going_backwards_keeps_order(frozen_clock):
+    first = uuid7()
+    frozen_clock[0] -= 1000
+    second = uuid7()
+
+    assert second > first
+    assert timestamp_ms(second) == timestamp_ms(first)
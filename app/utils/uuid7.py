@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_seq = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUID версии 7 (RFC 9562): 48 бит Unix времени в миллисекундах,
+    12 бит счётчика и 62 случайных бита.
+
+    Значения монотонно возрастают в пределах процесса: в одной миллисекунде
+    увеличивается счётчик, при его переполнении время сдвигается вперёд.
+    Новые строки попадают в правую часть B-дерева первичного ключа.
+
+    :return: UUID, совместимый с колонкой типа UUID
+    """
+    global _last_ms, _last_seq
+
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # Старший бит счётчика обнулён, чтобы оставить запас на инкременты
+            seq = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            ms = _last_ms
+            seq = _last_seq + 1
+            if seq > 0xFFF:
+                ms += 1
+                seq = 0
+        _last_ms, _last_seq = ms, seq
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= seq << 64
+    value |= 0b10 << 62
+    value |= rand_b
+    return uuid.UUID(int=value)
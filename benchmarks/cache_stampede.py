@@ -0,0 +1,120 @@
+"""
+Нагрузочный тест: сколько загрузок из БД вызывает одно истечение записи кэша.
+
+Несколько процессов (воркеров) одновременно запрашивают один и тот же ключ,
+загрузка имитирует запрос к БД (задержка --db-latency) и считается общим
+счётчиком. Каждый раунд начинается с истечения записи:
+    cold  - запись удалена (инвалидация, вытеснение, жёсткий TTL)
+    stale - запись пережила ttl, но ещё в пределах stale_ttl
+
+Режимы:
+    naive     - GET, при промахе загрузка и SET (поведение до защиты)
+    protected - VersionedCache.get_or_load: single-flight в процессе,
+                блокировка SET NX между воркерами, stale-while-revalidate
+
+Нужен доступный Redis, используется пространство имён bench_stampede.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.cache_stampede --workers 4 --concurrency 50 --rounds 5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from app.core.cache import VersionedCache
+from app.db.session import close_redis_pool, create_redis_client
+
+
+TTL = 1
+STALE_TTL = 30
+
+
+def make_cache(redis_client) -> VersionedCache:
+    # beta=0: раннее обновление не смешивается с замером истечения
+    return VersionedCache(redis_client, "bench_stampede", TTL, stale_ttl=STALE_TTL, beta=0)
+
+
+async def worker_round(mode: str, concurrency: int, db_latency: float, loads) -> None:
+    redis_client = create_redis_client()
+    cache = make_cache(redis_client)
+    key = await cache.key("listing")
+
+    async def loader() -> str:
+        with loads.get_lock():
+            loads.value += 1
+        await asyncio.sleep(db_latency)
+        return "payload"
+
+    async def naive_request() -> str:
+        value = await cache.get(key)
+        if value is None:
+            value = await loader()
+            await cache.set(key, value)
+        return value
+
+    async def protected_request() -> str:
+        return await cache.get_or_load(key, loader)
+
+    request = protected_request if mode == "protected" else naive_request
+    await asyncio.gather(*(request() for _ in range(concurrency)))
+    # Дожидаемся фоновых обновлений, чтобы они попали в счётчик раунда
+    while VersionedCache._background:
+        await asyncio.sleep(0.01)
+    await close_redis_pool()
+
+
+def run_worker(mode: str, concurrency: int, db_latency: float, loads, barrier) -> None:
+    barrier.wait()
+    asyncio.run(worker_round(mode, concurrency, db_latency, loads))
+
+
+async def prepare(expiry: str) -> None:
+    """Приведение записи к состоянию начала раунда"""
+    redis_client = create_redis_client()
+    cache = make_cache(redis_client)
+    key = await cache.key("listing")
+    await redis_client.delete(key, f"{key}:lock")
+    if expiry == "stale":
+        await cache.set(key, "payload")
+        await asyncio.sleep(TTL + 0.1)
+    await close_redis_pool()
+
+
+def run_round(mode: str, expiry: str, args) -> int:
+    asyncio.run(prepare(expiry))
+    loads = multiprocessing.Value("i", 0)
+    barrier = multiprocessing.Barrier(args.workers)
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(mode, args.concurrency, args.db_latency, loads, barrier))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return loads.value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=50, help="одновременных запросов на воркер")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--db-latency", type=float, default=0.2, help="длительность загрузки, с")
+    args = parser.parse_args()
+
+    print(f"{args.workers} воркеров x {args.concurrency} запросов на истечение")
+    print(f"{'mode':<11}{'expiry':<8}{'DB loads per expiry':>22}")
+    # В naive режиме запись живёт ровно TTL, поэтому истечение всегда cold
+    for mode, expiry in (("naive", "cold"), ("protected", "cold"), ("protected", "stale")):
+        started = time.perf_counter()
+        counts = [run_round(mode, expiry, args) for _ in range(args.rounds)]
+        elapsed = time.perf_counter() - started
+        print(f"{mode:<11}{expiry:<8}{sum(counts) / len(counts):>22.1f}"
+              f"   (min {min(counts)}, max {max(counts)}, {elapsed:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Бенчмарк: задержка глубоких страниц при OFFSET и keyset пагинации.
+
+Создаётся таблица bench_pagination (id uuid, date_create, title) с индексом
+(date_create DESC, id DESC), как у сообществ, и заполняется --rows строками.
+Для каждой глубины страницы замеряется медианная задержка:
+    offset - create_paginated_query (только выборка, без COUNT)
+    keyset - create_cursor_paginated_query с курсором на последнюю строку
+             предыдущей страницы (курсор готовится вне замера)
+
+Нужен доступный PostgreSQL. Таблица удаляется после прогона, если не указан --keep.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.deep_pagination --rows 1000000 --pages 1 100 1000 5000 50000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+
+from app.config import settings
+from app.core.pagination import create_cursor_paginated_query, create_paginated_query
+
+
+BenchBase = declarative_base()
+
+
+class BenchRow(BenchBase):
+    __tablename__ = "bench_pagination"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    date_create: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+    title: Mapped[str] = mapped_column(String(160), nullable=False)
+
+
+def feed_query():
+    return select(BenchRow).order_by(BenchRow.date_create.desc(), BenchRow.id.desc())
+
+
+async def seed(session: AsyncSession, rows: int) -> None:
+    await session.execute(text("DROP TABLE IF EXISTS bench_pagination"))
+    await session.execute(text(
+        "CREATE TABLE bench_pagination (id uuid PRIMARY KEY, date_create timestamp NOT NULL, title varchar(160) NOT NULL)"))
+    await session.execute(text(
+        "INSERT INTO bench_pagination "
+        "SELECT gen_random_uuid(), now() - make_interval(secs => (random() * 1e7)::int), 'community ' || g "
+        "FROM generate_series(1, :rows) AS g"), {"rows": rows})
+    await session.execute(text(
+        "CREATE INDEX ix_bench_pagination_date_create_id ON bench_pagination (date_create DESC, id DESC)"))
+    await session.commit()
+    await session.execute(text("ANALYZE bench_pagination"))
+
+
+async def measure(coro_factory, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000, 5000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="не удалять таблицу после прогона")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.get_database_string())
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await seed(session, args.rows)
+
+            print(f"{'page':>8}{'offset, ms':>14}{'keyset, ms':>14}")
+            for page in args.pages:
+                offset = (page - 1) * args.size
+                if offset >= args.rows:
+                    continue
+
+                cursor = None
+                if page > 1:
+                    # Курсор на последнюю строку предыдущей страницы
+                    boundary = (await session.execute(
+                        feed_query().offset(offset - 1).limit(1))).scalar_one()
+                    cursor = create_cursor_paginated_query(
+                        BenchRow, args.size, custom_query=feed_query())._encode(boundary, "next")
+
+                offset_ms = await measure(
+                    lambda: create_paginated_query(
+                        BenchRow, page, args.size, custom_query=feed_query()).fetch_service.fetch(session),
+                    args.repeat)
+                keyset_ms = await measure(
+                    lambda: create_cursor_paginated_query(
+                        BenchRow, args.size, cursor=cursor, custom_query=feed_query()).execute(session),
+                    args.repeat)
+                print(f"{page:>8}{offset_ms:>14.2f}{keyset_ms:>14.2f}")
+
+            if not args.keep:
+                await session.execute(text("DROP TABLE bench_pagination"))
+                await session.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
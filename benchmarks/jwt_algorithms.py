@@ -0,0 +1,58 @@
+"""
+Бенчмарк: скорость подписи и проверки JWT для RS256, ES256 и EdDSA.
+
+Ключи генерируются в памяти, в PyJWT передаются готовые объекты
+cryptography, как это делает JWTManager.
+
+Запуск (из корня репозитория):
+    python -m benchmarks.jwt_algorithms --iterations 2000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+
+def generate_keys() -> dict:
+    return {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def measure(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    payload = {
+        "type": "access",
+        "sub": "2f6a3c9e-8d1b-4c7a-9e2f-5b8d1a3c6e9f",
+        "username": "user",
+        "email": "user@example.com",
+        "iat": now,
+        "exp": now + timedelta(minutes=10),
+    }
+
+    print(f"{'алгоритм':>8} | {'подпись/с':>10} | {'проверка/с':>10} | размер токена")
+    for algorithm, private_key in generate_keys().items():
+        public_key = private_key.public_key()
+        token = jwt.encode(payload, private_key, algorithm=algorithm)
+        sign = measure(lambda: jwt.encode(payload, private_key, algorithm=algorithm), args.iterations)
+        verify = measure(lambda: jwt.decode(token, public_key, algorithms=[algorithm]), args.iterations)
+        print(f"{algorithm:>8} | {sign:>10.0f} | {verify:>10.0f} | {len(token)}")
+
+
+if __name__ == "__main__":
+    main()
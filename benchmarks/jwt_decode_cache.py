@@ -0,0 +1,61 @@
+"""
+Микробенчмарк: пропускная способность JWTManager.decode_jwt с кэшем
+проверенных токенов и без него.
+
+Токены выпускаются ключами из app/config/certs. Клиенты повторно
+присылают одни и те же токены: --distinct задаёт число разных токенов
+в потоке запросов.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.jwt_decode_cache --requests 20000 --distinct 100
+"""
+import argparse
+import logging
+import time
+
+from app.api.auth.token_cache import VerifiedTokenCache
+from app.api.auth.utils_jwt import JWTManager
+from app.config import settings
+
+
+def build_manager(token_cache: VerifiedTokenCache | None) -> JWTManager:
+    return JWTManager(
+        private_key_path=settings.private_key_path,
+        public_key_path=settings.public_key_path,
+        algorithm=settings.algorithm,
+        key_id=settings.jwt_key_id,
+        token_cache=token_cache,
+    )
+
+
+def run(name: str, manager: JWTManager, tokens: list[str], requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        manager.decode_jwt(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - started
+    ops = requests / elapsed
+    print(f"{name:>10}: {ops:>10.0f} decode/с ({elapsed:.2f} c на {requests} запросов)")
+    return ops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=100)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    issuer = build_manager(None)
+    tokens = [
+        issuer.encode_jwt({"sub": str(i), "type": "access"}, expire_minutes=10)
+        for i in range(args.distinct)
+    ]
+
+    uncached = run("без кэша", build_manager(None), tokens, args.requests)
+    cache = VerifiedTokenCache(max_size=args.distinct * 2)
+    cached = run("с кэшем", build_manager(cache), tokens, args.requests)
+    print(f"ускорение: x{cached / uncached:.1f}, кэш: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
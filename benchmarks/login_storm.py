@@ -0,0 +1,91 @@
+"""
+Бенчмарк: задержка посторонних запросов во время шторма логинов.
+
+Имитирует воркер uvicorn: в одном event loop одновременно идут проверки
+паролей bcrypt (шторм логинов) и лёгкий "посторонний эндпоинт", который
+каждые несколько миллисекунд отвечает без обращения к CPU. Для каждого
+режима выводятся p50/p99/max задержки постороннего эндпоинта.
+
+Режимы:
+    inline - bcrypt.checkpw прямо в корутине (поведение до пула)
+    pool   - AsyncPasswordHasher с пулом потоков и лимитом конкурентности
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.login_storm --logins 40 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bcrypt
+
+from app.api.auth.security import AsyncPasswordHasher, verify_password
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def unrelated_endpoint(stop: asyncio.Event, latencies: list[float], interval: float) -> None:
+    """Посторонний запрос: время между запланированным и фактическим ответом"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        latencies.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def login_storm(mode: str, hashed: str, logins: int, hasher: AsyncPasswordHasher) -> float:
+    async def login() -> bool:
+        if mode == "inline":
+            return verify_password("password", hashed)
+        return await hasher.verify("password", hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return time.perf_counter() - started
+
+
+async def run(mode: str, args: argparse.Namespace, hashed: str) -> None:
+    hasher = AsyncPasswordHasher(
+        executor_type="thread",
+        max_workers=args.workers,
+        max_concurrency=args.workers,
+        max_waiting=args.logins,
+        queue_timeout=60,
+    )
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(unrelated_endpoint(stop, latencies, args.interval))
+    await asyncio.sleep(args.interval * 5)
+    elapsed = await login_storm(mode, hashed, args.logins, hasher)
+    stop.set()
+    await probe
+    hasher.shutdown()
+
+    print(
+        f"{mode:>6}: логинов={args.logins} за {elapsed:.2f} c | "
+        f"посторонний эндпоинт p50={statistics.median(latencies):.1f} мс "
+        f"p99={percentile(latencies, 99):.1f} мс "
+        f"max={max(latencies):.1f} мс (n={len(latencies)})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12, help="стоимость bcrypt")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.005,
+                        help="период постороннего эндпоинта, c")
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=args.rounds)).decode("utf-8")
+    for mode in ("inline", "pool"):
+        asyncio.run(run(mode, args, hashed))
+
+
+if __name__ == "__main__":
+    main()
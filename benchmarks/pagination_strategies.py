@@ -0,0 +1,64 @@
+"""
+Бенчмарк: отдельный COUNT + выборка против count(*) OVER () одним запросом.
+
+Использует ту же таблицу bench_pagination, что и deep_pagination, заполненную
+--rows строками. Для каждой страницы замеряется медианная задержка
+Paginator.execute со стратегиями SEPARATE_COUNT и WINDOW. Если указан
+--filter, замер идёт по выборке с условием WHERE (примерно 10% строк).
+
+Нужен доступный PostgreSQL. Таблица удаляется после прогона, если не указан --keep.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.pagination_strategies --rows 3000000 --pages 1 100 1000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.core.enums import PaginationStrategy
+from app.core.pagination import create_paginated_query
+from benchmarks.deep_pagination import BenchRow, feed_query, measure, seed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--filter", action="store_true", help="выборка с условием WHERE")
+    parser.add_argument("--keep", action="store_true", help="не удалять таблицу после прогона")
+    args = parser.parse_args()
+
+    query = feed_query()
+    if args.filter:
+        query = query.where(BenchRow.title.like("community %0"))
+
+    engine = create_async_engine(settings.get_database_string())
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await seed(session, args.rows)
+
+            print(f"{'page':>8}{'separate, ms':>16}{'window, ms':>14}")
+            for page in args.pages:
+                results = {}
+                for strategy in (PaginationStrategy.SEPARATE_COUNT, PaginationStrategy.WINDOW):
+                    results[strategy] = await measure(
+                        lambda: create_paginated_query(
+                            BenchRow, page, args.size, custom_query=query, strategy=strategy).execute(session),
+                        args.repeat)
+                print(f"{page:>8}{results[PaginationStrategy.SEPARATE_COUNT]:>16.2f}"
+                      f"{results[PaginationStrategy.WINDOW]:>14.2f}")
+
+            if not args.keep:
+                await session.execute(text("DROP TABLE bench_pagination"))
+                await session.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Бенчмарк: страница ORM объектов против проекции колонок схемы ответа.
+
+Сравниваются два пути для страницы из --size строк со схемой ленты
+/communities/all_communities/:
+    entity    - select(модель) -> scalars() -> PaginatedResponse[CommunityAll]
+    projected - project_query(модель, CommunityAll) -> mappings()
+Каждая страница читается в новой сессии, как в отдельном запросе. Выводятся
+медианная задержка и пик выделенной памяти (tracemalloc) на страницу.
+
+Гидратация объектов и identity map - работа на стороне Python, поэтому
+по умолчанию используется SQLite в памяти и синхронная сессия. Для замера
+на PostgreSQL передайте --url с синхронным драйвером.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.projection --rows 20000 --size 100 --description 2000
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, String, Text, Uuid, create_engine, select
+from sqlalchemy.orm import Mapped, Session, declarative_base, mapped_column
+
+from app.api.communities.schemas import CommunityAll
+from app.core.pagination import PaginatedResponse, project_query
+
+
+BenchBase = declarative_base()
+
+
+class BenchCommunity(BenchBase):
+    __tablename__ = "bench_projection"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+    title: Mapped[str] = mapped_column(String(160), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    date_create: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+    image_logo: Mapped[str] = mapped_column(String(255), nullable=True)
+    admin_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False)
+
+
+def seed(engine, rows: int, description: int) -> None:
+    BenchBase.metadata.drop_all(engine)
+    BenchBase.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        session.add_all([
+            BenchCommunity(
+                id=uuid.uuid4(),
+                title=f"community {i}",
+                description="x" * description,
+                date_create=now - timedelta(seconds=i),
+                image_logo=f"media/community/{i}.png",
+                admin_id=uuid.uuid4(),
+            )
+            for i in range(rows)
+        ])
+        session.commit()
+
+
+def feed_query():
+    return select(BenchCommunity).order_by(BenchCommunity.date_create.desc(), BenchCommunity.id.desc())
+
+
+def entity_page(engine, page: int, size: int):
+    with Session(engine) as session:
+        query = feed_query().limit(size).offset((page - 1) * size)
+        items = session.execute(query).scalars().all()
+        return PaginatedResponse[CommunityAll].build(items, page, size)
+
+
+def projected(schema):
+    def page_func(engine, page: int, size: int):
+        with Session(engine) as session:
+            query = project_query(BenchCommunity, schema, feed_query()).limit(size).offset((page - 1) * size)
+            items = session.execute(query).mappings().all()
+            return PaginatedResponse[schema].build(items, page, size)
+    return page_func
+
+
+def measure(func, engine, pages: list[int], size: int) -> tuple[float, float]:
+    timings = []
+    for page in pages:
+        started = time.perf_counter()
+        func(engine, page, size)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    peaks = []
+    for page in pages[:20]:
+        tracemalloc.start()
+        func(engine, page, size)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings), statistics.median(peaks) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--description", type=int, default=2000, help="длина description в символах")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    seed(engine, args.rows, args.description)
+    max_page = args.rows // args.size
+    pages = [1 + i % max_page for i in range(args.repeat)]
+
+    modes = (
+        ("entity", entity_page),
+        ("projected", projected(CommunityAll)),
+    )
+    # Прогрев: компиляция запросов и схем
+    for _, func in modes:
+        func(engine, 1, args.size)
+
+    print(f"{'mode':<12}{'p50, ms':>10}{'peak, KiB':>12}")
+    for name, func in modes:
+        latency, peak = measure(func, engine, pages, args.size)
+        print(f"{name:<12}{latency:>10.2f}{peak:>12.1f}")
+
+    BenchBase.metadata.drop_all(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Бенчмарк: скорость вставки в большую таблицу с первичным ключом UUIDv4 и UUIDv7.
+
+Для каждой версии создаётся таблица (id uuid PRIMARY KEY, payload text),
+в неё пачками вставляется --rows строк. Выводятся вставок в секунду,
+объём WAL, записанный за прогон, и размер индекса первичного ключа.
+Случайные v4 ключи разбрасывают вставки по всему B-дереву, v7 ключи
+дописываются в его правый край.
+
+Нужен доступный PostgreSQL. Таблицы создаются с префиксом bench_uuid_
+и удаляются после прогона, если не указан --keep.
+
+Запуск (из корня репозитория, с переменными окружения из .env):
+    python -m benchmarks.uuid_insert --rows 2000000 --batch 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import asyncpg
+
+from app.config import settings
+from app.utils.uuid7 import uuid7
+
+
+GENERATORS = {
+    "v4": uuid.uuid4,
+    "v7": uuid7,
+}
+
+
+async def run(connection: asyncpg.Connection, version: str, rows: int, batch: int, keep: bool) -> dict:
+    table = f"bench_uuid_{version}"
+    generate = GENERATORS[version]
+    payload = "x" * 64
+
+    await connection.execute(f"DROP TABLE IF EXISTS {table}")
+    await connection.execute(f"CREATE TABLE {table} (id uuid PRIMARY KEY, payload text NOT NULL)")
+    await connection.execute("CHECKPOINT")
+
+    wal_start = await connection.fetchval("SELECT pg_current_wal_lsn()")
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        size = min(batch, rows - inserted)
+        await connection.copy_records_to_table(
+            table, records=[(generate(), payload) for _ in range(size)], columns=("id", "payload"))
+        inserted += size
+    elapsed = time.perf_counter() - started
+    wal_bytes = await connection.fetchval(
+        "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), $1)", wal_start)
+    index_size = await connection.fetchval(
+        "SELECT pg_relation_size($1::regclass)", f"{table}_pkey")
+
+    if not keep:
+        await connection.execute(f"DROP TABLE {table}")
+
+    return {
+        "rows_per_s": rows / elapsed,
+        "wal_mb": float(wal_bytes) / 1024 / 1024,
+        "index_mb": index_size / 1024 / 1024,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true", help="не удалять таблицы после прогона")
+    args = parser.parse_args()
+
+    dsn = settings.get_database_string().replace("postgresql+asyncpg://", "postgresql://")
+    connection = await asyncpg.connect(dsn)
+    try:
+        print(f"{'uuid':<6}{'rows/s':>12}{'WAL, MB':>12}{'pkey, MB':>12}")
+        for version in GENERATORS:
+            result = await run(connection, version, args.rows, args.batch, args.keep)
+            print(f"{version:<6}{result['rows_per_s']:>12.0f}{result['wal_mb']:>12.1f}{result['index_mb']:>12.1f}")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())